@@ -68,86 +68,158 @@ if __name__ == '__main__':
 
 # blocking chnages 
 
-from flask import Flask, render_template, request, jsonify
-import sybpydb
-import random
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+import json
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+from opentelemetry.sdk.resources import Resource
+import sybase_pool
+from sybase_pool import get_pool
+from db_metadata import fetch_object_counts
+from metadata_cache import MetadataCache
+from blocking import fetch_blocking_rows, analyze_blocking
+from host_sampler import sampler
+from fanout import fan_out
 
 app = Flask(__name__)
 
 # Configuration for Sybase connection
-app.config['SYBASE_SERVER'] = 'your_sybase_server'
 app.config['SYBASE_USER'] = 'your_username'
 app.config['SYBASE_PASSWORD'] = 'your_password'
 
-# Helper function to connect to Sybase
-def connect_to_sybase():
-    conn = sybpydb.connect(
-        server=app.config['SYBASE_SERVER'],
+# Registry of selectable servers: form value -> Sybase server name
+app.config['SYBASE_SERVERS'] = {
+    'sybase_server_1': 'your_sybase_server_1',
+    'sybase_server_2': 'your_sybase_server_2',
+}
+app.config['SYBASE_SERVER_TIMEOUT'] = 10
+
+# Pool settings for Sybase connections
+app.config['SYBASE_POOL_SIZE'] = 5
+app.config['SYBASE_POOL_TIMEOUT'] = 10
+
+# Connection pool metrics are exported over OTLP
+app.config['OTLP_ENDPOINT'] = 'http://localhost:4317'
+meter_provider = MeterProvider(
+    resource=Resource.create({'service.name': 'sybase-flask-ui'}),
+    metric_readers=[PeriodicExportingMetricReader(
+        OTLPMetricExporter(endpoint=app.config['OTLP_ENDPOINT'], insecure=True))]
+)
+sybase_pool.instrument(meter_provider.get_meter('sybase_pool'))
+
+# Helper function to borrow a pooled Sybase connection
+def connect_to_sybase(server):
+    pool = get_pool(
+        server,
+        server=server,
         user=app.config['SYBASE_USER'],
-        password=app.config['SYBASE_PASSWORD']
+        password=app.config['SYBASE_PASSWORD'],
+        max_size=app.config['SYBASE_POOL_SIZE'],
+        checkout_timeout=app.config['SYBASE_POOL_TIMEOUT']
     )
-    return conn
-
-# Dummy functions for CPU and memory usage
-# Replace these with actual implementations
+    return pool.connection()
+
+# Cache settings for database metadata (seconds / entries)
+app.config['METADATA_CACHE_TTL'] = 300
+app.config['METADATA_CACHE_STALE_TTL'] = 600
+app.config['METADATA_CACHE_SIZE'] = 256
+
+# Helper function to load object counts for the metadata cache
+def load_object_counts(server, databases):
+    with connect_to_sybase(server) as conn:
+        return fetch_object_counts(conn, databases)
+
+metadata_cache = MetadataCache(
+    load_object_counts,
+    ttl=app.config['METADATA_CACHE_TTL'],
+    stale_ttl=app.config['METADATA_CACHE_STALE_TTL'],
+    max_entries=app.config['METADATA_CACHE_SIZE']
+)
+
+# CPU and memory usage come from the shared background sampler
 def get_cpu_usage():
-    return random.randint(0, 100)
+    return sampler.latest()['cpu_usage']
 
 def get_memory_usage():
-    return random.randint(0, 100)
+    return sampler.latest()['memory_usage']
 
 # Route to render the main UI
 @app.route('/')
 def index():
+    # Both values from one sample, so they describe the same moment
+    sample = sampler.latest()
     server_info = {
-        'cpu_usage': get_cpu_usage(),
-        'memory_usage': get_memory_usage()
+        'cpu_usage': sample['cpu_usage'],
+        'memory_usage': sample['memory_usage']
     }
-    return render_template('index.html', server_info=server_info)
+    return render_template('index.html', server_info=server_info,
+                           servers=app.config['SYBASE_SERVERS'])
+
+# Route to stream live CPU and memory samples (Server-Sent Events)
+@app.route('/server_stats/stream')
+def server_stats_stream():
+    def events():
+        seq = 0
+        while True:
+            seq, sample = sampler.wait_for_sample(seq, timeout=15)
+            if sample is None:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(sample)}\n\n"
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
 
 # Route to fetch and display database info
 @app.route('/database_info', methods=['POST'])
 def database_info():
-    selected_server = request.form['server']
-    selected_database = request.form['database']
-    
-    conn = connect_to_sybase()
-    cursor = conn.cursor()
-
-    cursor.execute(f"use {selected_database}")
-    
-    cursor.callproc("sp_tables_count")
-    table_count = cursor.fetchone()[0]
-
-    cursor.callproc("sp_views_count")
-    view_count = cursor.fetchone()[0]
-
-    cursor.callproc("sp_procedures_count")
-    procedure_count = cursor.fetchone()[0]
-    
-    conn.close()
-
-    return render_template('database_info.html', 
-                           table_count=table_count, 
-                           view_count=view_count, 
-                           procedure_count=procedure_count,
-                           database=selected_database)
-
-# Route to check for blocking processes
+    registry = app.config['SYBASE_SERVERS']
+    selected_servers = [name for name in request.form.getlist('server') if name in registry]
+    # Several databases can be requested at once, separated by commas
+    selected_databases = [name.strip() for name in request.form['database'].split(',') if name.strip()]
+    if not selected_servers or not selected_databases:
+        return render_template('database_info.html', databases=[], errors={},
+                               message='Select at least one server and enter a database name.'), 400
+
+    # Query every selected server in parallel; cached databases are served
+    # directly and the rest are fetched in one round trip per server
+    def server_counts(name):
+        return metadata_cache.get_many(registry[name], selected_databases)
+
+    results, errors = fan_out(server_counts, selected_servers,
+                              timeout=app.config['SYBASE_SERVER_TIMEOUT'])
+
+    databases = [
+        dict(server=name, name=database, **counts)
+        for name in selected_servers if name in results
+        for database, counts in results[name].items()
+    ]
+    message = None if databases or errors else 'No information found for the selected databases.'
+    return render_template('database_info.html', databases=databases, errors=errors, message=message)
+
+# Route to check for blocking processes on the selected servers (all registered ones by default)
 @app.route('/check_blocking', methods=['POST'])
 def check_blocking():
-    conn = connect_to_sybase()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT spid, blocked FROM sysprocesses WHERE blocked > 0")
-    blocking_processes = cursor.fetchall()
-    
-    conn.close()
-
-    if blocking_processes:
-        return jsonify(blocking_processes=blocking_processes)
-    else:
-        return jsonify(message="No blocking found on server.")
+    registry = app.config['SYBASE_SERVERS']
+    requested = request.form.getlist('server')
+    selected_servers = [name for name in requested if name in registry] if requested else list(registry)
+    if not selected_servers:
+        return jsonify(error="Unknown server selected."), 400
+
+    # Build the blocking graph server-side: head blockers, chain depth, cycles
+    def server_blocking(name):
+        with connect_to_sybase(registry[name]) as conn:
+            return analyze_blocking(fetch_blocking_rows(conn))
+
+    results, errors = fan_out(server_blocking, selected_servers,
+                              timeout=app.config['SYBASE_SERVER_TIMEOUT'])
+    servers = {
+        name: blocking if blocking['edges'] else {'message': "No blocking found on server."}
+        for name, blocking in results.items()
+    }
+    return jsonify(servers=servers, errors=errors)
 
 if __name__ == '__main__':
     app.run(debug=True)
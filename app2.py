@@ -1,6 +1,8 @@
-from flask import Flask, jsonify
-import sybpydb
+from flask import Flask, jsonify, request, Response, stream_with_context
+from contextlib import ExitStack
 import time
+from sybase_pool import get_pool
+from result_stream import iter_rows, stream_json, stream_ndjson
 
 # OpenTelemetry imports
 from opentelemetry import trace, metrics
@@ -13,6 +15,8 @@ from opentelemetry.instrumentation.logging import LoggingInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -26,8 +30,11 @@ tracer = trace.get_tracer(__name__)
 span_processor = BatchSpanProcessor(OTLPSpanExporter())
 trace.get_tracer_provider().add_span_processor(span_processor)
 
-# Metrics provider setup
-metrics.set_meter_provider(MeterProvider(resource=resource))
+# Metrics provider setup; the reader exports app and connection pool metrics
+metrics.set_meter_provider(MeterProvider(
+    resource=resource,
+    metric_readers=[PeriodicExportingMetricReader(OTLPMetricExporter())],
+))
 meter = metrics.get_meter(__name__)
 db_query_counter = meter.create_counter(
     name="db_query_count",
@@ -46,45 +53,106 @@ DB_CONFIG = {
     "database": "your_database_name",
     "username": "your_username",
     "password": "your_password",
+    "pool_size": 5,
 }
 
+# Streaming settings for /query1
+QUERY1_ROW_CAP = 10000  # Most rows returned by one request
+QUERY1_BATCH_SIZE = 500  # Rows per fetchmany round trip
+QUERY1_KEY_COLUMN = "id"  # Unique, ordered column used as the pagination cursor
+QUERY1_KEY_TYPE = int  # Python type of QUERY1_KEY_COLUMN, used to parse ?after=
+
 
 def connect_to_sybase():
-    """Connect to Sybase database."""
-    conn = sybpydb.connect(
+    """Borrow a pooled connection to the Sybase database."""
+    pool = get_pool(
+        DB_CONFIG["server"],
         servername=DB_CONFIG["server"],
         user=DB_CONFIG["username"],
         password=DB_CONFIG["password"],
         database=DB_CONFIG["database"],
+        max_size=DB_CONFIG["pool_size"],
     )
-    return conn
+    return pool.connection()
 
 
 @app.route("/query1", methods=["GET"])
 def query1():
-    """Run a simple query and return the result."""
-    start_time = time.time()
-    with tracer.start_as_current_span("query1"):
+    """
+    Stream the rows of a query as JSON (default) or NDJSON (?format=ndjson).
+
+    Rows are read in fetchmany batches and written as they arrive, up to
+    ?limit= rows (capped at QUERY1_ROW_CAP). Pass the returned next_cursor
+    as ?after= to fetch the following page.
+    """
+    limit = max(1, min(request.args.get("limit", QUERY1_ROW_CAP, type=int), QUERY1_ROW_CAP))
+    after = request.args.get("after")
+    if after is not None:
+        # Bind the cursor with the key column's type; ASE will not compare it to a string
         try:
-            conn = connect_to_sybase()
-            cursor = conn.cursor()
-            query = "SELECT TOP 10 * FROM your_table"
-            
-            # Execute query
-            cursor.execute(query)
-            result = cursor.fetchall()
+            after = QUERY1_KEY_TYPE(after)
+        except ValueError:
+            return jsonify({"error": f"Invalid after cursor: {after!r}"}), 400
+    ndjson = request.args.get("format") == "ndjson"
+
+    # Fetch one row past the limit to find out whether another page exists
+    query = f"SELECT TOP {limit + 1} * FROM your_table"
+    params = ()
+    if after is not None:
+        query += f" WHERE {QUERY1_KEY_COLUMN} > ?"
+        params = (after,)
+    query += f" ORDER BY {QUERY1_KEY_COLUMN}"
 
-            # Update metrics
-            db_query_counter.add(1, {"query_name": "query1"})
-
-            # Return result
-            return jsonify(result)
-        except Exception as e:
-            trace.get_current_span().record_exception(e)
-            return jsonify({"error": str(e)}), 500
-        finally:
-            duration = time.time() - start_time
-            print(f"Query executed in {duration:.2f} seconds")
+    start_time = time.time()
+    span = tracer.start_span("query1")
+    try:
+        with ExitStack() as stack:
+            conn = stack.enter_context(connect_to_sybase())
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            key_index = [column[0] for column in cursor.description].index(QUERY1_KEY_COLUMN)
+            # The connection now belongs to the response generator below
+            release_connection = stack.pop_all()
+    except Exception as e:
+        span.record_exception(e)
+        span.end()
+        return jsonify({"error": str(e)}), 500
+
+    # Update metrics
+    db_query_counter.add(1, {"query_name": "query1"})
+
+    page = {"next_cursor": None}
+
+    def rows():
+        count = 0
+        last_row = None
+        for row in iter_rows(cursor, QUERY1_BATCH_SIZE):
+            if count == limit:
+                page["next_cursor"] = last_row[key_index]
+                break
+            count += 1
+            last_row = row
+            yield row
+        span.set_attribute("row_count", count)
+
+    def generate():
+        with release_connection:
+            try:
+                if ndjson:
+                    yield from stream_ndjson(rows(), page)
+                else:
+                    yield from stream_json(rows(), page)
+            except Exception as e:
+                span.record_exception(e)
+                raise
+            finally:
+                cursor.close()
+                span.end()
+                duration = time.time() - start_time
+                print(f"Query executed in {duration:.2f} seconds")
+
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
 
 
 @app.route("/query2", methods=["GET"])
@@ -92,13 +160,13 @@ def query2():
     """Run another query."""
     with tracer.start_as_current_span("query2"):
         try:
-            conn = connect_to_sybase()
-            cursor = conn.cursor()
             query = "SELECT COUNT(*) FROM another_table"
-            
+
             # Execute query
-            cursor.execute(query)
-            result = cursor.fetchone()
+            with connect_to_sybase() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query)
+                result = cursor.fetchone()
 
             # Update metrics
             db_query_counter.add(1, {"query_name": "query2"})
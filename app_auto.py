@@ -7,6 +7,8 @@ from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from metric_views import meter_provider_options, LOW_LATENCY_BUCKETS
+from sql_fingerprint import fingerprint
 
 # OpenTelemetry Collector endpoint
 OTEL_COLLECTOR_ENDPOINT = "http://<your-collector-endpoint>:5608"
@@ -21,7 +23,11 @@ tracer = tracer_init("SybaseApp", OTEL_COLLECTOR_ENDPOINT)
 resource = Resource.create({"service.name": "SybaseApp"})
 metric_exporter = OTLPMetricExporter(endpoint=OTEL_COLLECTOR_ENDPOINT)
 metric_reader = PeriodicExportingMetricReader(metric_exporter, export_interval_millis=5000)
-meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
+meter_provider = MeterProvider(
+    resource=resource,
+    metric_readers=[metric_reader],
+    **meter_provider_options(buckets={"app_db_query_duration": LOW_LATENCY_BUCKETS}),
+)
 metrics.set_meter_provider(meter_provider)
 meter = metrics.get_meter("SybaseAppMetrics")
 
@@ -33,6 +39,7 @@ app_up_metric = meter.create_observable_gauge(
 )
 query_duration_metric = meter.create_histogram(
     "app_db_query_duration",
+    unit="s",
     description="Time taken to execute database query",
 )
 
@@ -74,7 +81,7 @@ def connect_and_query():
             # Log and record metrics
             log.info(f"Query executed successfully. Result: {result[0]}")
             span.set_attribute("db.query.result_count", result[0])
-            query_duration_metric.record(duration)
+            query_duration_metric.record(duration, {"statement": fingerprint(QUERY)})
 
             log.info(f"Query duration: {duration:.2f} seconds")
             span.set_attribute("db.query.duration", duration)
@@ -2,11 +2,16 @@ from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.metrics import get_meter
+from opentelemetry.metrics import get_meter, Observation
 from lib.tracer import tracer_init
 from lib.logger import log
+from sybase_session import SybaseSession
+from metrics_snapshot import SnapshotCollector, CachedSnapshot
+from host_snapshot import collect_host_snapshot
+from poll_scheduler import PollScheduler
+from metric_views import meter_provider_options, LOW_LATENCY_BUCKETS
+from sql_fingerprint import fingerprint
 import sybpydb
-import psutil
 import time
 
 # Initialize Tracer
@@ -19,63 +24,110 @@ metric_exporter = OTLPMetricExporter(
     insecure=True,
 )
 metric_reader = PeriodicExportingMetricReader(exporter=metric_exporter, export_interval_millis=5000)
-meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
+meter_provider = MeterProvider(
+    resource=resource,
+    metric_readers=[metric_reader],
+    **meter_provider_options(
+        buckets={"app.db.query.duration": LOW_LATENCY_BUCKETS},
+        exponential=["sybase.session.reconnect.duration"],
+    ),
+)
 meter = get_meter("test_python_app", meter_provider=meter_provider)
 
 # Define Metrics
+# All host gauges of one export cycle share a single psutil snapshot
+host_snapshot = CachedSnapshot(collect_host_snapshot, max_age=1)
+
 def get_cpu_usage():
-    return psutil.cpu_percent()
+    return host_snapshot.get()["cpu_usage"]
 
 def get_memory_usage():
-    return psutil.virtual_memory().percent
+    return host_snapshot.get()["memory_usage"]
 
 def get_disk_usage():
-    return psutil.disk_usage('/').percent
+    return host_snapshot.get()["disk_usage"]
 
 def get_process_count():
-    return len(psutil.pids())
+    return host_snapshot.get()["process_count"]
 
-def get_db_connection_status():
+# Probe Sybase once per interval; every DB gauge reads the shared snapshot
+DB_PROBE_INTERVAL = 5  # Seconds, matches the metric export interval
+
+def probe_sybase():
+    start_time = time.time()
     try:
         connection = sybpydb.connect(servername="your_server_name", database="your_database_name")
         connection.close()
-        return 1  # 1 indicates the DB connection is up
-    except Exception:
-        return 0  # 0 indicates the DB connection is down
+        db_up = 1  # 1 indicates the DB connection is up
+        error = None
+    except Exception as e:
+        db_up = 0  # 0 indicates the DB connection is down
+        error = str(e)
+    return {"db_up": db_up, "error": error, "probe_duration": time.time() - start_time}
+
+db_probe = SnapshotCollector(probe_sybase, interval=DB_PROBE_INTERVAL, name="sybase-probe").start()
+
+def get_db_connection_status():
+    # A snapshot older than a few intervals means the probe itself is stuck
+    snapshot = db_probe.latest(max_age=3 * DB_PROBE_INTERVAL)
+    return snapshot["db_up"] if snapshot else 0
+
+def get_db_probe_duration():
+    snapshot = db_probe.latest()
+    return [Observation(snapshot["probe_duration"])] if snapshot else []
 
 # Add Observable Gauges with Proper Callbacks
 cpu_usage = meter.create_observable_gauge(
     "app.cpu.usage",
-    callbacks=[lambda options: get_cpu_usage()],
+    callbacks=[lambda options: [Observation(get_cpu_usage())]],
     description="CPU usage of the application",
 )
 
 memory_usage = meter.create_observable_gauge(
     "app.memory.usage",
-    callbacks=[lambda options: get_memory_usage()],
+    callbacks=[lambda options: [Observation(get_memory_usage())]],
     description="Memory usage of the application",
 )
 
 disk_usage = meter.create_observable_gauge(
     "app.disk.usage",
-    callbacks=[lambda options: get_disk_usage()],
+    callbacks=[lambda options: [Observation(get_disk_usage())]],
     description="Disk usage of the application",
 )
 
 process_count = meter.create_observable_gauge(
     "app.process.count",
-    callbacks=[lambda options: get_process_count()],
+    callbacks=[lambda options: [Observation(get_process_count())]],
     description="Number of processes running on the system",
 )
 
+process_cpu_usage = meter.create_observable_gauge(
+    "app.process.cpu.usage",
+    callbacks=[lambda options: [Observation(host_snapshot.get()["process_cpu_usage"])]],
+    description="CPU usage of this process",
+)
+
+process_memory_usage = meter.create_observable_gauge(
+    "app.process.memory.rss",
+    callbacks=[lambda options: [Observation(host_snapshot.get()["process_memory_rss"])]],
+    description="Resident memory of this process in bytes",
+)
+
 db_connection_status = meter.create_observable_gauge(
     "app.db.connection.status",
-    callbacks=[lambda options: get_db_connection_status()],
+    callbacks=[lambda options: [Observation(get_db_connection_status())]],
     description="Database connection status (1 for up, 0 for down)",
 )
 
+db_probe_duration = meter.create_observable_gauge(
+    "app.db.probe.duration",
+    callbacks=[lambda options: get_db_probe_duration()],
+    description="Time taken by the last Sybase connectivity probe",
+)
+
 db_query_duration = meter.create_histogram(
     "app.db.query.duration",
+    unit="s",
     description="Time taken to execute a database query",
 )
 
@@ -85,50 +137,52 @@ user_logged_in = meter.create_counter(
 )
 
 # Function to Connect to Sybase and Run a Query
+def on_sybase_connect(connection):
+    user_id = connection.getuser()  # Get the user ID once per login
+    log.info(f"Connected to Sybase database as user: {user_id}")
+    user_logged_in.add(1, {"user_id": user_id})
+
+# Long-lived Sybase session reused by every loop iteration
+sybase_session = SybaseSession(
+    lambda: sybpydb.connect(servername="your_server_name", database="your_database_name"),
+    on_connect=on_sybase_connect,
+    meter=meter,
+)
+
 def query_sybase():
     with tracer.start_as_current_span("sybase-query", attributes={"db.system": "sybase"}):
         try:
             start_time = time.time()
-            
-            # Establish connection
-            connection = sybpydb.connect(servername="your_server_name", database="your_database_name")
-            user_id = connection.getuser()  # Get the user ID
-            log.info(f"Connected to Sybase database as user: {user_id}")
-            user_logged_in.add(1, {"user_id": user_id})
 
-            # Execute a query
+            # Execute a query on the long-lived session (reconnects only when needed)
             query = "SELECT COUNT(*) FROM your_table_name"  # Replace with your actual query
-            cursor = connection.cursor()
-            cursor.execute(query)
-            result = cursor.fetchone()
+            with sybase_session.cursor() as cursor:
+                cursor.execute(query)
+                result = cursor.fetchone()
             log.info(f"Query result: {result[0]}")
 
-            # Record query duration
+            # Record query duration, inside the span so it can carry an exemplar
             duration = time.time() - start_time
-            db_query_duration.record(duration, {"query": "SELECT COUNT(*)"})
+            db_query_duration.record(duration, {"statement": fingerprint(query)})
             log.info(f"Query executed in {duration:.2f} seconds")
 
-            cursor.close()
-            connection.close()
-
         except Exception as e:
             log.error(f"Failed to execute query: {e}")
 
 # Function to Check App Status
 def check_app_status():
-    try:
-        log.info("Performing app health check")
-        connection = sybpydb.connect(servername="your_server_name", database="your_database_name")
-        connection.close()
-        log.info("App is up and running")
-        return 1  # App is up
-    except Exception as e:
-        log.error(f"App health check failed: {e}")
+    snapshot = db_probe.latest(max_age=3 * DB_PROBE_INTERVAL)
+    if snapshot is None:
+        log.error("App health check failed: no recent Sybase probe")
         return 0  # App is down
+    if snapshot["db_up"]:
+        return 1  # App is up
+    log.error(f"App health check failed: {snapshot['error']}")
+    return 0  # App is down
 
 app_status = meter.create_observable_gauge(
     "app.status",
-    callbacks=[lambda options: check_app_status()],
+    callbacks=[lambda options: [Observation(check_app_status())]],
     description="Application status (1 for up, 0 for down)",
 )
 
@@ -139,15 +193,26 @@ def main():
         query_sybase()  # Call the function to run the Sybase query
         log.info("Main operation completed successfully")
 
+def sybase_pressure():
+    # Back off while the server is unreachable or slow to accept a connection
+    snapshot = db_probe.latest(max_age=3 * DB_PROBE_INTERVAL)
+    if snapshot is None or not snapshot["db_up"]:
+        return 2.0
+    return 2.0 if snapshot["probe_duration"] > 1 else 1.0
+
+def run_main():
+    try:
+        main()
+    except Exception as e:
+        log.error(f"An error occurred in the main loop: {e}")
+        raise
+
 # Run Application Loop
 if __name__ == "__main__":
     log.info("Starting Python application with OpenTelemetry metrics and tracing")
-    while True:
-        try:
-            main()
-        except Exception as e:
-            log.error(f"An error occurred in the main loop: {e}")
-        time.sleep(5)
+    scheduler = PollScheduler(pressure=sybase_pressure, meter=meter, name="test_python_app")
+    scheduler.add("main", run_main, 5, max_interval=60)
+    scheduler.run_forever()
 
 
 
@@ -163,6 +228,7 @@ from opentelemetry.metrics import get_meter
 from lib.tracer import tracer_init
 from lib.logger import log
 import sybpydb
+from sql_fingerprint import fingerprint
 import psutil
 import time
 
@@ -251,7 +317,7 @@ def query_sybase():
 
             # Record query duration
             duration = time.time() - start_time
-            db_query_duration.record(duration, {"query": "SELECT COUNT(*)"})
+            db_query_duration.record(duration, {"statement": fingerprint(query)})
             log.info(f"Query executed in {duration:.2f} seconds")
 
             cursor.close()
@@ -311,6 +377,7 @@ from opentelemetry.metrics import get_meter
 from lib.tracer import tracer_init  # Assuming you have tracer_init in lib.tracer
 from lib.logger import log  # Assuming you have log setup in lib.logger
 import sybpydb
+from sql_fingerprint import fingerprint
 import psutil  # For CPU and memory metrics
 import time
 
@@ -367,7 +434,7 @@ def query_sybase():
 
             # Log the result and increment counter
             log.info(f"Query result: {result[0]}")
-            db_query_counter.add(1, {"query": "SELECT COUNT(*)"})
+            db_query_counter.add(1, {"statement": fingerprint(query)})
 
             cursor.close()
             connection.close()
@@ -627,6 +694,7 @@ except KeyboardInterrupt:
 
 #pip install opentelemetry-api opentelemetry-sdk opentelemetry-exporter-otlp psutil sybpydb
 import sybpydb
+from sql_fingerprint import statement_attributes
 import psutil
 import time
 from lib.trace import tracer_init  # Your custom tracing setup
@@ -680,7 +748,7 @@ def execute_query(query: str):
     """
     tracer = trace.get_tracer(__name__)
     with tracer.start_as_current_span(
-        "execute_query", attributes={"query": query}
+        "execute_query", attributes=statement_attributes(query)
     ) as span:
         try:
             conn = connect_to_sybase()
@@ -1078,6 +1146,7 @@ if __name__ == "__main__":
 
 
 import sybpydb
+from sql_fingerprint import statement_attributes
 import psutil
 import time
 from lib.trace import tracer_init  # Your custom tracing setup
@@ -1131,7 +1200,7 @@ def execute_query(query: str):
     """
     tracer = trace.get_tracer(__name__)
     with tracer.start_as_current_span(
-        "execute_query", attributes={"query": query}
+        "execute_query", attributes=statement_attributes(query)
     ) as span:
         try:
             conn = connect_to_sybase()
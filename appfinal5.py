@@ -2,11 +2,12 @@ from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.metrics import get_meter
+from opentelemetry.metrics import get_meter, Observation
 from lib.tracer import tracer_init
 from lib.logger import log
+from sybase_session import SybaseSession
+from host_sampler import HostSampler
 import sybpydb
-import psutil
 import time
 
 # Initialize Tracer
@@ -22,27 +23,41 @@ metric_reader = PeriodicExportingMetricReader(exporter=metric_exporter, export_i
 meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
 meter = get_meter("test_python_app", meter_provider=meter_provider)
 
+# Host stats are sampled once a second on a background thread; callbacks
+# report the average over the last export interval without blocking
+host_sampler = HostSampler(interval=1, window=5).start()
+
 # Callback Functions for Metrics
-def collect_cpu_usage(observer):
+def collect_cpu_usage(options):
     try:
-        usage = psutil.cpu_percent(interval=1)
-        observer.observe(usage, {"metric": "cpu_usage"})
+        return [Observation(host_sampler.average("cpu_usage"), {"metric": "cpu_usage"})]
     except Exception as e:
         log.error(f"Failed to collect CPU usage: {e}")
+        return []
 
-def collect_memory_usage(observer):
+def collect_memory_usage(options):
     try:
-        memory = psutil.virtual_memory()
-        observer.observe(memory.percent, {"metric": "memory_usage"})
+        return [Observation(host_sampler.latest()["memory_usage"], {"metric": "memory_usage"})]
     except Exception as e:
         log.error(f"Failed to collect memory usage: {e}")
+        return []
 
-def collect_disk_usage(observer):
+def collect_disk_usage(options):
     try:
-        disk = psutil.disk_usage("/")
-        observer.observe(disk.percent, {"metric": "disk_usage"})
+        return [Observation(host_sampler.latest()["disk_usage"], {"metric": "disk_usage"})]
     except Exception as e:
         log.error(f"Failed to collect disk usage: {e}")
+        return []
+
+def collect_network_usage(options):
+    try:
+        return [
+            Observation(host_sampler.average("net_sent_rate"), {"direction": "transmit"}),
+            Observation(host_sampler.average("net_recv_rate"), {"direction": "receive"}),
+        ]
+    except Exception as e:
+        log.error(f"Failed to collect network usage: {e}")
+        return []
 
 def collect_db_connection_status(observer):
     try:
@@ -71,6 +86,13 @@ meter.create_observable_gauge(
     callbacks=[collect_disk_usage],
 )
 
+meter.create_observable_gauge(
+    "app.network.io.rate",
+    description="Network throughput of the host in bytes per second",
+    unit="By/s",
+    callbacks=[collect_network_usage],
+)
+
 meter.create_observable_gauge(
     "app.db.connection.status",
     description="Database connection status (1 for up, 0 for down)",
@@ -88,22 +110,28 @@ user_logged_in = meter.create_counter(
 )
 
 # Function to Query Sybase and Log Metrics
+def on_sybase_connect(connection):
+    user_id = connection.getuser()  # Get the user ID once per login
+    log.info(f"Connected to Sybase database as user: {user_id}")
+    user_logged_in.add(1, {"user_id": user_id})
+
+# Long-lived Sybase session reused by every loop iteration
+sybase_session = SybaseSession(
+    lambda: sybpydb.connect(servername="your_server_name", database="your_database_name"),
+    on_connect=on_sybase_connect,
+    meter=meter,
+)
+
 def query_sybase():
     with tracer.start_as_current_span("sybase-query", attributes={"db.system": "sybase"}):
         try:
             start_time = time.time()
-            
-            # Establish connection
-            connection = sybpydb.connect(servername="your_server_name", database="your_database_name")
-            user_id = connection.getuser()  # Get the user ID
-            log.info(f"Connected to Sybase database as user: {user_id}")
-            user_logged_in.add(1, {"user_id": user_id})
 
-            # Execute a query
+            # Execute a query on the long-lived session (reconnects only when needed)
             query = "SELECT COUNT(*) FROM your_table_name"  # Replace with your actual query
-            cursor = connection.cursor()
-            cursor.execute(query)
-            result = cursor.fetchone()
+            with sybase_session.cursor() as cursor:
+                cursor.execute(query)
+                result = cursor.fetchone()
             log.info(f"Query result: {result[0]}")
 
             # Record query duration
@@ -111,9 +139,6 @@ def query_sybase():
             db_query_duration.record(duration, {"query": "SELECT COUNT(*)"})
             log.info(f"Query executed in {duration:.2f} seconds")
 
-            cursor.close()
-            connection.close()
-
         except Exception as e:
             log.error(f"Failed to execute query: {e}")
 
@@ -1,5 +1,5 @@
 import time
-import psutil
+from host_sampler import HostSampler
 from prometheus_client import Gauge
 from opentelemetry import trace
 from opentelemetry.sdk.metrics import MeterProvider
@@ -33,10 +33,15 @@ memory_usage_gauge = meter.create_gauge(
     "process_memory_usage", description="Process memory usage in bytes"
 )
 
+# Background psutil sampler; reading it only waits for the first sample
+host_sampler = HostSampler(interval=1, window=10).start()
+
 def track_process_metrics():
-    """Track and export CPU and memory usage using psutil."""
-    cpu_usage = psutil.cpu_percent(interval=1)
-    memory_usage = psutil.virtual_memory().used
+    """Track and export CPU and memory usage from the background sampler."""
+    # One sample for both values, so they describe the same moment
+    sample = host_sampler.latest()
+    cpu_usage = sample["cpu_usage"]
+    memory_usage = sample["memory_used"]
 
     # Export metrics to OpenTelemetry Collector
     cpu_usage_gauge.add(cpu_usage)
@@ -1,6 +1,10 @@
 import time
 import os
 import sybpydb
+from sybase_pool import get_pool
+from query_runner import run_queries
+from result_stream import BoundedRows
+from sql_fingerprint import fingerprint, statement_attributes
 import psutil
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
@@ -74,6 +78,13 @@ meter.create_observable_gauge(
     description="Memory usage of the process in MB",
 )
 
+# Result budget per query; larger results are truncated rather than held in memory
+MAX_RESULT_ROWS = 1000
+MAX_RESULT_BYTES = 1024 * 1024
+
+# Longest a single query may run before it is cancelled (seconds)
+QUERY_DEADLINE = 30
+
 def connect_to_sybase(server, user, password, database):
     """
     Connect to Sybase database.
@@ -88,17 +99,22 @@ def connect_to_sybase(server, user, password, database):
             raise
 
 
-def execute_query(connection, query):
+def execute_query(statements, query):
     """
-    Execute a query on the Sybase database.
+    Execute a query on the Sybase database through the statement cache.
     """
     with tracer.start_as_current_span("sybase_query") as span:
         start_time = time.time()
         try:
-            cursor = connection.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
-            span.set_attribute("query", query)
+            cursor = statements.execute(query)
+            rows = BoundedRows(cursor, max_rows=MAX_RESULT_ROWS, max_bytes=MAX_RESULT_BYTES)
+            results = list(rows)
+            if rows.truncated:
+                # Unread rows are still pending on the cursor; open a fresh one next time
+                statements.discard(query)
+            span.set_attribute("db.row_count", rows.row_count)
+            span.set_attribute("db.result_truncated", rows.truncated)
+            span.set_attributes(statement_attributes(query))
             span.set_attribute("query.success", True)
             query_count.add(1)
             return results
@@ -108,7 +124,7 @@ def execute_query(connection, query):
             raise
         finally:
             execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-            query_execution_time.record(execution_time, {"query": query})
+            query_execution_time.record(execution_time, {"statement": fingerprint(query)})
             span.set_attribute("execution_time_ms", execution_time)
 
 
@@ -119,32 +135,33 @@ def run_application():
     password = "YOUR_PASSWORD"
     database = "YOUR_DATABASE"
 
-    # Connect to Sybase
-    try:
-        connection = connect_to_sybase(server, user, password, database)
-    except Exception as e:
-        print(f"Error during connection: {e}")
-        return
-
     # Queries to execute
     queries = [
         "SELECT COUNT(*) FROM your_table",  # Replace with your actual query
         "SELECT TOP 10 * FROM your_table",  # Replace with your actual query
     ]
 
+    # Small connection pool so the queries can run side by side; the headroom
+    # covers cancelled queries whose connections are still being closed
+    pool = get_pool(
+        server,
+        connect=lambda: connect_to_sybase(server, user, password, database),
+        max_size=2 * len(queries),
+    )
+
     # Run continuously
     while True:
-        for query in queries:
-            try:
-                results = execute_query(connection, query)
+        # Independent queries run in parallel; the cycle lasts as long as the slowest one
+        for query, results, error in run_queries(pool, execute_query, queries, timeout=QUERY_DEADLINE):
+            if error:
+                print(f"Error executing query '{query}': {error}")
+            else:
                 print(f"Results for query '{query}': {results}")
-            except Exception as e:
-                print(f"Error executing query '{query}': {e}")
 
         # Sleep for 10 seconds before the next iteration
         time.sleep(10)
 
-    connection.close()
+    pool.close()
     print("Connection closed.")
 
 
@@ -1,6 +1,10 @@
 import time
 import logging
 import sybpydb
+from sql_fingerprint import statement_attributes
+from sybase_pool import get_pool
+from query_runner import run_queries
+from result_stream import BoundedRows
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
@@ -39,6 +43,10 @@ metrics.set_meter_provider(meter_provider)
 # System Metrics Instrumentation
 SystemMetricsInstrumentor().instrument()
 
+# Result budget per query; larger results are truncated rather than held in memory
+MAX_RESULT_ROWS = 1000
+MAX_RESULT_BYTES = 1024 * 1024
+
 def connect_to_sybase(server, user, password, database):
     """
     Connect to Sybase database.
@@ -54,19 +62,24 @@ def connect_to_sybase(server, user, password, database):
             raise
 
 
-def execute_query(connection, query):
+def execute_query(statements, query, params=None):
     """
-    Execute a query on the Sybase database.
+    Execute a query on the Sybase database through the statement cache.
     """
     logger.info(f"Executing query: {query}")
     with tracer.start_as_current_span("sybase_query") as span:
         start_time = time.time()
         try:
-            cursor = connection.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
-            logger.info(f"Query executed successfully. Results: {results}")
-            span.set_attribute("query", query)
+            cursor = statements.execute(query, params)
+            rows = BoundedRows(cursor, max_rows=MAX_RESULT_ROWS, max_bytes=MAX_RESULT_BYTES)
+            results = list(rows)
+            if rows.truncated:
+                # Unread rows are still pending on the cursor; open a fresh one next time
+                statements.discard(query)
+            span.set_attribute("db.row_count", rows.row_count)
+            span.set_attribute("db.result_truncated", rows.truncated)
+            logger.info(f"Query executed successfully. Rows: {rows.row_count}, truncated: {rows.truncated}")
+            span.set_attributes(statement_attributes(query))
             span.set_attribute("query.success", True)
             return results
         except Exception as e:
@@ -80,6 +93,10 @@ def execute_query(connection, query):
             logger.info(f"Query execution time: {execution_time} ms")
 
 
+# Longest a single query may run before it is cancelled (seconds)
+QUERY_DEADLINE = 30
+
+
 def run_application():
     # Configuration
     server = "YOUR_SERVER"
@@ -87,32 +104,32 @@ def run_application():
     password = "YOUR_PASSWORD"
     database = "YOUR_DATABASE"
 
-    # Connect to Sybase
-    try:
-        connection = connect_to_sybase(server, user, password, database)
-    except Exception as e:
-        logger.error(f"Error during connection: {e}")
-        return
-
     # Queries to execute
     queries = [
         "SELECT COUNT(*) FROM your_table",  # Replace with your actual query
         "SELECT TOP 10 * FROM your_table",  # Replace with your actual query
     ]
 
+    # Small connection pool so the queries can run side by side; the headroom
+    # covers cancelled queries whose connections are still being closed
+    pool = get_pool(
+        server,
+        connect=lambda: connect_to_sybase(server, user, password, database),
+        max_size=2 * len(queries),
+    )
+
     # Run continuously
     while True:
-        for query in queries:
-            try:
-                results = execute_query(connection, query)
-            except Exception as e:
-                logger.error(f"Error during query execution: {e}")
+        # Independent queries run in parallel; the cycle lasts as long as the slowest one
+        for query, results, error in run_queries(pool, execute_query, queries, timeout=QUERY_DEADLINE):
+            if error:
+                logger.error(f"Error during query execution: {error}")
 
         # Sleep for 10 seconds before the next iteration
         logger.info("Sleeping for 10 seconds before the next query iteration.")
         time.sleep(10)
 
-    connection.close()
+    pool.close()
     logger.info("Connection closed.")
 
 
@@ -1,4 +1,3 @@
-import subprocess
 import time
 import psutil  # For process and system-level metrics
 from opentelemetry import trace
@@ -8,6 +7,7 @@ from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExport
 from opentelemetry.sdk.metrics import MeterProvider, Counter
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader, ConsoleMetricExporter
 from opentelemetry.sdk.metrics import ObservableGauge
+from autorep import query_jobs
 
 # Initialize OpenTelemetry Tracer
 trace.set_tracer_provider(TracerProvider())
@@ -42,26 +42,26 @@ network_usage_gauge = meter.create_observable_gauge(
 )
 
 # Function to check Autosys job status
-def check_autosys_job_status(job_name):
-    """Check the status of an Autosys job."""
-    command = f"autorep -j {job_name}"  # Change the command according to your environment
-    try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            return result.stdout
+def check_autosys_job_statuses(job_names):
+    """Check the status of several Autosys jobs with as few autorep calls as possible."""
+    jobs, errors = query_jobs(job_names)
+    statuses = {}
+    for job_name in job_names:
+        if jobs[job_name]:
+            job = jobs[job_name][0]
+            statuses[job_name] = f"{job.status} (run {job.run}, last start {job.last_start}, last end {job.last_end})"
         else:
-            return f"Error checking job {job_name}: {result.stderr}"
-    except Exception as e:
-        return f"Exception occurred: {str(e)}"
+            statuses[job_name] = f"Error checking job {job_name}: {'; '.join(errors.values()) or 'not found'}"
+    return statuses
 
 # Monitor Autosys jobs and print status
 def monitor_jobs():
     job_names = ['job1', 'job2', 'job3']  # Add your job names here
     while True:
+        with tracer.start_as_current_span("Checking Autosys jobs"):
+            statuses = check_autosys_job_statuses(job_names)
         for job_name in job_names:
-            with tracer.start_as_current_span(f"Checking {job_name}"):
-                status = check_autosys_job_status(job_name)
-                print(f"Job {job_name} status:\n{status}")
+            print(f"Job {job_name} status:\n{statuses[job_name]}")
         time.sleep(60)  # Check every 60 seconds
 
 if __name__ == "__main__":
@@ -1,5 +1,9 @@
 import time
 import sybpydb
+from sybase_pool import get_pool
+from query_runner import run_queries
+from result_stream import BoundedRows
+from sql_fingerprint import fingerprint, statement_attributes
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
@@ -40,23 +44,35 @@ query_count_metric = meter.create_counter(
 # Tracer
 tracer = trace.get_tracer("sybase_app")
 
+# Result budget per query; larger results are truncated rather than held in memory
+MAX_RESULT_ROWS = 1000
+MAX_RESULT_BYTES = 1024 * 1024
+
+# Longest a single query may run before it is cancelled (seconds)
+QUERY_DEADLINE = 30
+
 def connect_to_sybase(server, user, password, database):
     """
     Connects to the Sybase database.
     """
     return sybpydb.connect(server=server, user=user, password=password, database=database)
 
-def execute_query(connection, query):
+def execute_query(statements, query):
     """
-    Executes a query on the Sybase database.
+    Executes a query on the Sybase database through the statement cache.
     """
     with tracer.start_as_current_span("execute_query") as span:
         start_time = time.time()
         try:
-            cursor = connection.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
-            span.set_attribute("query", query)
+            cursor = statements.execute(query)
+            rows = BoundedRows(cursor, max_rows=MAX_RESULT_ROWS, max_bytes=MAX_RESULT_BYTES)
+            results = list(rows)
+            if rows.truncated:
+                # Unread rows are still pending on the cursor; open a fresh one next time
+                statements.discard(query)
+            span.set_attribute("db.row_count", rows.row_count)
+            span.set_attribute("db.result_truncated", rows.truncated)
+            span.set_attributes(statement_attributes(query))
             span.set_attribute("query.success", True)
             query_count_metric.add(1)
             return results
@@ -66,7 +82,7 @@ def execute_query(connection, query):
             raise
         finally:
             execution_time = (time.time() - start_time) * 1000  # Convert to ms
-            query_execution_time_metric.record(execution_time, {"query": query})
+            query_execution_time_metric.record(execution_time, {"statement": fingerprint(query)})
             span.set_attribute("execution_time_ms", execution_time)
 
 def main():
@@ -76,28 +92,29 @@ def main():
     password = "YOUR_PASSWORD"
     database = "YOUR_DATABASE"
 
-    try:
-        connection = connect_to_sybase(server, user, password, database)
-        print("Connected to Sybase database.")
-    except Exception as e:
-        print(f"Failed to connect to Sybase: {e}")
-        return
-
     # Execute queries
     queries = [
         "SELECT COUNT(*) FROM your_table",
         "SELECT TOP 10 * FROM your_table",
     ]
 
-    for query in queries:
-        try:
-            results = execute_query(connection, query)
+    # Small connection pool so the queries can run side by side; the headroom
+    # covers cancelled queries whose connections are still being closed
+    pool = get_pool(
+        server,
+        connect=lambda: connect_to_sybase(server, user, password, database),
+        max_size=2 * len(queries),
+    )
+
+    # The queries run in parallel; this takes as long as the slowest one
+    for query, results, error in run_queries(pool, execute_query, queries, timeout=QUERY_DEADLINE):
+        if error:
+            print(f"Failed to execute query '{query}': {error}")
+        else:
             print(f"Query executed successfully: {query}")
             print("Results:", results)
-        except Exception as e:
-            print(f"Failed to execute query '{query}': {e}")
 
-    connection.close()
+    pool.close()
     print("Connection closed.")
 
 if __name__ == "__main__":
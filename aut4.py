@@ -1,7 +1,6 @@
 from time import sleep
-from random import choice, randint
-from opentelemetry.metrics import get_meter
 from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.metrics import Observation
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
@@ -11,6 +10,9 @@ from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.trace import SpanKind
 import os
 import subprocess
+from autorep import query_jobs
+from job_metrics import JobMetrics, JOB_DURATION_BUCKETS
+from metric_views import meter_provider_options
 
 # Resource configuration
 resource = Resource.create({"service.name": "autosys-job-monitor"})
@@ -24,8 +26,12 @@ tracer = tracer_provider.get_tracer("autosys-job-monitor")
 # Metrics configuration
 exporter = OTLPMetricExporter(endpoint="http://localhost:4317", insecure=True)
 reader = PeriodicExportingMetricReader(exporter, export_interval_millis=5000)
-meter_provider = MeterProvider(resource=resource, metric_readers=[reader])
-meter = get_meter("autosys-job-monitor")
+meter_provider = MeterProvider(
+    resource=resource,
+    metric_readers=[reader],
+    **meter_provider_options(buckets={"autosys.job.run.duration": JOB_DURATION_BUCKETS}),
+)
+meter = meter_provider.get_meter("autosys-job-monitor")
 
 # Helper to get CPU usage
 def get_cpu_usage():
@@ -58,34 +64,26 @@ def get_memory_usage():
         print(f"Error fetching memory usage: {e}")
         return 0.0
 
-# Simulate job status
-def check_job_status(job_name):
-    statuses = ["SUCCESS", "FAILURE", "RUNNING", "PENDING"]
-    status = choice(statuses)
-    duration = randint(1000, 10000)  # Simulate job duration in ms
-    return status, duration
+# Longest a job may run before it counts as late (seconds)
+JOB_SLA = 3600
+
+# Run durations from autorep's Last Start/Last End, status counts and late jobs
+job_metrics = JobMetrics(meter, default_sla=JOB_SLA)
 
 # Monitor multiple job patterns
 def monitor_jobs(job_patterns):
-    for job_pattern in job_patterns:
-        for i in range(1, 4):  # Simulate 3 jobs per pattern
-            job_name = f"{job_pattern}_job_{i}"
-            status, duration = check_job_status(job_name)
-
-            print(f"Monitoring {job_pattern}: Job Name={job_name}, Status={status}, Duration={duration}ms")
+    with tracer.start_as_current_span("autosys_job_cycle", kind=SpanKind.INTERNAL) as span:
+        jobs_by_pattern, errors = query_jobs(job_patterns)
+        for query, error in errors.items():
+            print(f"Error checking {query}: {error}")
+        job_metrics.record(jobs_by_pattern, complete=not errors)
 
-            # Start a span for each job
-            with tracer.start_as_current_span(
-                f"job_{job_name}",
-                kind=SpanKind.INTERNAL,
-                attributes={
-                    "job.name": job_name,
-                    "job.pattern": job_pattern,
-                    "job.status": status,
-                    "job.duration_ms": duration,
-                },
-            ) as span:
-                sleep(duration / 1000.0)  # Simulate job duration
+        for job_pattern, jobs in jobs_by_pattern.items():
+            for job in jobs:
+                duration = job.duration
+                duration_text = f"{duration * 1000:.0f}ms" if duration is not None else "n/a"
+                print(f"Monitoring {job_pattern}: Job Name={job.name}, Status={job.status}, Duration={duration_text}")
+        span.set_attribute("jobs.total", sum(len(jobs) for jobs in jobs_by_pattern.values()))
 
 # Register CPU and Memory as metrics
 def register_metrics():
@@ -94,7 +92,7 @@ def register_metrics():
         name="system.cpu.usage_percent",
         description="Current CPU usage percentage",
         unit="%",
-        callbacks=[lambda: [get_cpu_usage()]],  # Corrected callback
+        callbacks=[lambda options: [Observation(get_cpu_usage())]],
     )
 
     # Gauge for Memory usage
@@ -102,7 +100,7 @@ def register_metrics():
         name="system.memory.usage_percent",
         description="Current Memory usage percentage",
         unit="%",
-        callbacks=[lambda: [get_memory_usage()]],  # Corrected callback
+        callbacks=[lambda options: [Observation(get_memory_usage())]],
     )
 
 def main():
@@ -0,0 +1,194 @@
+import os
+import re
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+from operator import attrgetter
+
+from autorep_parser import parse_autorep
+
+# autorep binary; override when it is not on PATH
+AUTOREP = os.environ.get("AUTOREP", "autorep")
+
+# At most this many autorep processes run at once, whatever the number of patterns
+AUTOREP_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=AUTOREP_WORKERS, thread_name_prefix="autorep")
+
+
+class AutorepError(Exception):
+    """autorep failed, exited non-zero or ran past its timeout."""
+
+
+def _kill(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass  # Already gone
+
+
+@contextmanager
+def stream_autorep(args, timeout=60):
+    """
+    Run autorep with the given arguments (no shell) and yield its stdout
+    for reading line by line, so large reports are never held in memory.
+
+    The caller must read to the end. A process still running after timeout
+    seconds is killed (with anything it started) and AutorepError is raised
+    on exit, as it is for a non-zero exit status.
+    """
+    command = [AUTOREP, *args]
+    # stderr goes to a file so a chatty autorep cannot block on a full pipe
+    with tempfile.TemporaryFile(mode="w+") as error:
+        try:
+            # Own process group, so a timeout also kills anything autorep started
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=error, text=True,
+                                       start_new_session=True)
+        except OSError as e:
+            raise AutorepError(f"Cannot run {AUTOREP}: {e}") from e
+
+        deadline = time.monotonic() + timeout
+        watchdog = threading.Timer(timeout, _kill, (process,))
+        watchdog.start()
+        try:
+            with process.stdout:
+                yield process.stdout
+            returncode = process.wait(timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            _kill(process)
+            process.wait()
+            raise AutorepError(f"{' '.join(command)} timed out after {timeout}s")
+        except BaseException:
+            _kill(process)
+            process.wait()
+            raise
+        finally:
+            watchdog.cancel()
+
+        if returncode != 0:
+            if time.monotonic() >= deadline:
+                raise AutorepError(f"{' '.join(command)} timed out after {timeout}s")
+            error.seek(0)
+            raise AutorepError(f"{' '.join(command)} exited with {returncode}: {error.read().strip()}")
+
+
+def run_autorep(args, timeout=60):
+    """Run autorep with the given arguments (no shell) and return its stdout."""
+    with stream_autorep(args, timeout) as output:
+        return output.read()
+
+
+def map_autorep(func, items):
+    """
+    Run func(item) for every item on the bounded autorep pool.
+
+    func is expected to call run_autorep, whose timeout is the per-call
+    deadline, so every call finishes. A cycle therefore takes about as long
+    as its slowest call rather than the sum of all of them.
+
+    Returns (results, errors), both keyed by item.
+    """
+    futures = {item: _executor.submit(func, item) for item in items}
+    results = {}
+    errors = {}
+    for item, future in futures.items():
+        try:
+            results[item] = future.result()
+        except Exception as e:
+            errors[item] = str(e)
+    return results, errors
+
+
+# Last _part or trailing number of a job name; what remains (up to and
+# including the last _) is its family prefix
+_JOB_SUFFIX = re.compile(r"(?<=_)[^_]+$|\d+$")
+
+# Fewest plain job names a prefix* query replaces; smaller families are
+# cheaper to fetch by name than to pull in a wider pattern for
+MIN_MERGED_NAMES = 3
+
+
+def _is_pattern(target):
+    return "*" in target or "%" in target
+
+
+def matches(name, target):
+    """True if job name matches target, a job name or an autorep pattern (* or %)."""
+    if not _is_pattern(target):
+        return name == target
+    return fnmatchcase(name, target.replace("%", "*"))
+
+
+def plan_queries(targets, min_merged=MIN_MERGED_NAMES):
+    """
+    Reduce job names and patterns to as few autorep -J arguments as possible.
+
+    Duplicates and targets already covered by a wider pattern are dropped;
+    at least min_merged plain job names sharing a prefix (all but their
+    last _part or trailing digits) are merged into one prefix* pattern.
+    Unrelated targets are never widened further: however many queries
+    remain, they run on the bounded autorep pool (AUTOREP_WORKERS at a
+    time). A merged pattern can return jobs nobody asked for; query_jobs()
+    drops them as they are parsed.
+    """
+    # Most general first, so a pattern is kept before anything it covers
+    ordered = sorted(dict.fromkeys(targets), key=lambda target: len(target.replace("*", "").replace("%", "")))
+    kept = []
+    for target in ordered:
+        if not any(_is_pattern(pattern) and matches(target.replace("%", "*"), pattern) for pattern in kept):
+            kept.append(target)
+
+    groups = {}
+    queries = []
+    for target in kept:
+        prefix = _JOB_SUFFIX.sub("", target)
+        if _is_pattern(target) or len(prefix) < 3:
+            queries.append(target)
+        else:
+            groups.setdefault(prefix, []).append(target)
+    for prefix, names in groups.items():
+        queries.extend(names if len(names) < min_merged else [f"{prefix}*"])
+    return queries
+
+
+def route_jobs(jobs, targets, name=attrgetter("name")):
+    """Map every target to the jobs it covers; a job can belong to several targets."""
+    routes = {target: [] for target in targets}
+    for job in jobs:
+        job_name = name(job)
+        for target in targets:
+            if matches(job_name, target):
+                routes[target].append(job)
+    return routes
+
+
+def query_jobs(targets, parse=parse_autorep, extra_args=(), timeout=60, name=attrgetter("name")):
+    """
+    Fetch every job covered by targets with as few autorep calls as possible.
+
+    The planned queries run concurrently on the autorep pool; parse(lines)
+    turns each output, streamed line by line, into job records. Records
+    matching none of the targets (pulled in by a merged prefix* query) are
+    dropped; the rest are de-duplicated by name and routed back to every
+    target they match.
+
+    Returns ({target: [jobs]}, {query: error}).
+    """
+    jobs = {}
+    jobs_lock = threading.Lock()
+
+    def run(query):
+        # Records are kept as they stream in, so no report is held as a whole
+        with stream_autorep(["-J", query, *extra_args], timeout=timeout) as lines:
+            for job in parse(lines):
+                if any(matches(name(job), target) for target in targets):
+                    with jobs_lock:
+                        jobs.setdefault(name(job), job)
+
+    _, errors = map_autorep(run, plan_queries(targets))
+    return route_jobs(jobs.values(), targets, name), errors
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+# autorep's default DATE_FORMAT; change it if the instance is configured differently
+AUTOREP_DATE_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+# Two-letter ST column codes and the status names used in job checks
+STATUS_NAMES = {
+    "AC": "ACTIVATED",
+    "FA": "FAILURE",
+    "IN": "INACTIVE",
+    "NE": "ON_NOEXEC",
+    "OH": "ON_HOLD",
+    "OI": "ON_ICE",
+    "PE": "PEND_MACH",
+    "QU": "QUE_WAIT",
+    "RE": "RESTART",
+    "RU": "RUNNING",
+    "RW": "RESWAIT",
+    "ST": "STARTING",
+    "SU": "SUCCESS",
+    "TE": "TERMINATED",
+    "WA": "WAIT_REPLY",
+}
+
+# Written in the date columns when a job has not started or ended
+NO_DATE = "-----"
+
+
+class JobRecord:
+    """One job line of an autorep summary report."""
+
+    __slots__ = ("name", "last_start", "last_end", "status", "run", "pri")
+
+    def __init__(self, name, last_start, last_end, status, run, pri):
+        self.name = name
+        self.last_start = last_start  # datetime or None
+        self.last_end = last_end  # datetime or None
+        self.status = status  # Full status name, e.g. SUCCESS
+        self.run = run  # Run/Ntry, e.g. "12345/1"
+        self.pri = pri  # Pri/Xit: priority, or exit code once finished
+
+    @property
+    def duration(self):
+        """Seconds between the last start and end, if the last run has finished."""
+        if self.last_start and self.last_end and self.last_end >= self.last_start:
+            return (self.last_end - self.last_start).total_seconds()
+        return None
+
+    def __repr__(self):
+        return f"JobRecord({self.name!r}, {self.status})"
+
+
+def _take_date(tokens, index):
+    """Read a date column starting at tokens[index]; return (datetime or None, next index)."""
+    if index >= len(tokens) or tokens[index].startswith(NO_DATE):
+        return None, index + 1
+    # A set date is always a date and a time token; skip both even if they do not
+    # parse, so the time is never read as the status
+    try:
+        return datetime.strptime(f"{tokens[index]} {tokens[index + 1]}", AUTOREP_DATE_FORMAT), index + 2
+    except (IndexError, ValueError):
+        return None, index + 2
+
+
+def parse_line(line):
+    """Parse one report line into a JobRecord, or None for headers, rulers and blanks."""
+    tokens = line.split()
+    if not tokens or tokens[0].startswith("_") or line.startswith("Job Name"):
+        return None
+    last_start, index = _take_date(tokens, 1)
+    last_end, index = _take_date(tokens, index)
+    rest = tokens[index:]
+    if not rest:
+        return None
+    status = STATUS_NAMES.get(rest[0], rest[0])
+    run = rest[1] if len(rest) > 1 else None
+    pri = rest[2] if len(rest) > 2 else None
+    return JobRecord(tokens[0], last_start, last_end, status, run, pri)
+
+
+def parse_autorep(lines):
+    """
+    Yield a JobRecord per job from autorep summary output, one line at a
+    time, so a box with thousands of children is never held as one string.
+
+    Columns are read by token rather than fixed width, since long job names
+    push the others to the right: Job Name, Last Start, Last End (each a
+    date and time or -----), ST, Run/Ntry and Pri/Xit.
+    """
+    for line in lines:
+        record = parse_line(line)
+        if record is not None:
+            yield record
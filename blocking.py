@@ -0,0 +1,92 @@
+from collections import defaultdict
+
+# Every blocked spid plus every spid that blocks one, in a single pass
+BLOCKING_QUERY = """
+SELECT spid, blocked, time_blocked
+FROM master..sysprocesses
+WHERE blocked > 0
+   OR spid IN (SELECT blocked FROM master..sysprocesses WHERE blocked > 0)
+"""
+
+
+def fetch_blocking_rows(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(BLOCKING_QUERY)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _find_cycles(blocked_by):
+    """
+    Return the blocking cycles (deadlocked spids) in the wait-for graph.
+
+    Each spid waits on at most one other, so one walk per unvisited spid
+    finds every cycle in O(n).
+    """
+    state = {}  # spid -> index of the walk that first reached it
+    cycles = []
+    for walk, start in enumerate(blocked_by):
+        path = []
+        spid = start
+        while spid in blocked_by and spid not in state:
+            state[spid] = walk
+            path.append(spid)
+            spid = blocked_by[spid]
+        if spid in state and state[spid] == walk:
+            # We came back to a spid seen on this walk: everything from it on is a cycle
+            cycles.append(path[path.index(spid):])
+    return cycles
+
+
+def analyze_blocking(rows):
+    """
+    Build the blocking graph from (spid, blocked, time_blocked) rows.
+
+    Returns a JSON-ready dict with one summary per head blocker (chain depth,
+    number of waiting spids and their total wait in seconds), any cycles,
+    and the raw [spid, blocked_by] edges.
+    """
+    blocked_by = {}
+    wait_time = {}
+    waiters = defaultdict(list)
+    for spid, blocked, time_blocked in rows:
+        wait_time[spid] = time_blocked or 0
+        if blocked:
+            blocked_by[spid] = blocked
+            waiters[blocked].append(spid)
+
+    cycles = _find_cycles(blocked_by)
+    in_cycle = {spid for cycle in cycles for spid in cycle}
+
+    # Head blockers are not waiting on anyone; each cycle acts as one root
+    roots = [[spid] for spid in waiters if spid not in blocked_by]
+    roots.extend(cycles)
+
+    summaries = []
+    for members in roots:
+        depth = 0
+        count = 0
+        total_wait = 0
+        level = [spid for member in members for spid in waiters[member] if spid not in in_cycle]
+        while level:
+            depth += 1
+            count += len(level)
+            total_wait += sum(wait_time.get(spid, 0) for spid in level)
+            level = [child for spid in level for child in waiters.get(spid, ())]
+        summary = {"depth": depth, "waiters": count, "total_wait": total_wait}
+        if len(members) == 1 and members[0] not in in_cycle:
+            summary["spid"] = members[0]
+        else:
+            summary["cycle"] = members
+            summary["waiters"] += len(members)
+            summary["total_wait"] += sum(wait_time.get(spid, 0) for spid in members)
+        summaries.append(summary)
+
+    summaries.sort(key=lambda summary: summary["total_wait"], reverse=True)
+    return {
+        "roots": summaries,
+        "cycles": cycles,
+        "edges": [[spid, blocker] for spid, blocker in blocked_by.items()],
+    }
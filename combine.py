@@ -14,7 +14,11 @@ from opentelemetry.instrumentation.system_metrics import SystemMetricsInstrument
 from opentelemetry.exporter.otlp.proto.grpc.log_exporter import OTLPLogExporter
 from opentelemetry._logs import set_log_emitter_provider
 from opentelemetry.trace.status import Status, StatusCode
+from opentelemetry.metrics import Observation
 from sybpydb import connect
+from sybase_session import SybaseSession
+from health_probe import run_health_probe
+from delta import DeltaTracker
 
 # Define the OTLP endpoint
 OTLP_ENDPOINT = "http://localhost:4317"
@@ -52,28 +56,74 @@ log_handler = LoggingHandler(level=logging.INFO, log_exporter=log_exporter)
 logging.basicConfig(level=logging.INFO, handlers=[log_handler])
 logger = logging.getLogger(__name__)
 
+# Latest readings; the gauges below report them on every export
+latest_values = {}
+
+def observe_latest(name):
+    """Gauge callback reporting the latest recorded value of a reading."""
+    def callback(options):
+        value = latest_values.get(name)
+        return [] if value is None else [Observation(value)]
+    return callback
+
 # Application-specific custom metrics
-active_connections_metric = meter.create_up_down_counter(
+active_connections_metric = meter.create_observable_gauge(
     name="sybase_active_connections",
     description="Number of active connections in the Sybase database",
     unit="1",
+    callbacks=[observe_latest("active_connections")],
 )
-transaction_rate_metric = meter.create_up_down_counter(
+transaction_rate_metric = meter.create_observable_gauge(
     name="sybase_transaction_rate",
     description="Transaction rate in the Sybase database",
     unit="transactions/s",
+    callbacks=[observe_latest("transaction_rate")],
+)
+transactions_total_metric = meter.create_counter(
+    name="sybase_transactions_total",
+    description="Transactions completed in the Sybase database",
+    unit="1",
+)
+
+# monProcessActivity counts are cumulative per process; this turns them into deltas
+transaction_tracker = DeltaTracker()
+blocked_spids_metric = meter.create_observable_gauge(
+    name="sybase_blocked_spids",
+    description="Number of Sybase processes currently blocked",
+    unit="1",
+    callbacks=[observe_latest("blocked_spids")],
+)
+tempdb_usage_metric = meter.create_observable_gauge(
+    name="sybase_tempdb_usage_percent",
+    description="Percentage of tempdb space in use",
+    unit="%",
+    callbacks=[observe_latest("tempdb_usage_percent")],
+)
+
+def observe_log_usage(options):
+    """Report transaction log usage for every database."""
+    usage = latest_values.get("log_usage_percent") or {}
+    return [Observation(percent, {"db": db}) for db, percent in usage.items()]
+
+log_usage_metric = meter.create_observable_gauge(
+    name="sybase_log_usage_percent",
+    description="Percentage of the transaction log in use per database",
+    unit="%",
+    callbacks=[observe_log_usage],
 )
 
 # Process-level custom metrics (CPU and memory usage of the application)
-cpu_usage_metric = meter.create_up_down_counter(
+cpu_usage_metric = meter.create_observable_gauge(
     name="process_cpu_usage_percent",
     description="CPU usage percentage of the process",
     unit="%",
+    callbacks=[observe_latest("process_cpu")],
 )
-memory_usage_metric = meter.create_up_down_counter(
+memory_usage_metric = meter.create_observable_gauge(
     name="process_memory_usage_bytes",
     description="Memory usage of the process in bytes",
     unit="bytes",
+    callbacks=[observe_latest("process_memory")],
 )
 
 # Helper functions
@@ -85,47 +135,23 @@ def get_memory_usage():
     """Fetch memory usage of the current process in bytes (RSS)."""
     return psutil.Process().memory_info().rss
 
-def fetch_active_connections():
-    """Fetch the number of active connections in Sybase."""
-    query = "SELECT COUNT(*) FROM master..sysprocesses WHERE status='active'"
-    result = trace_sybase_query(query, "Fetch Active Connections")
-    return result[0][0] if result else 0
-
-def fetch_transaction_rate():
-    """Fetch the transaction rate in Sybase."""
-    query = """
-        SELECT COUNT(*) AS transaction_count 
-        FROM master..syslogins 
-        WHERE logindatetime > GETDATE() - 1
-    """
-    result = trace_sybase_query(query, "Calculate Transaction Rate")
-    return result[0][0] if result else 0
-
-# Tracing for Sybase operations
-def trace_sybase_query(query, operation_context):
-    """
-    Trace a Sybase query with a dynamic operation name.
-    
-    :param query: The SQL query to execute.
-    :param operation_context: A dynamic description of the operation.
-    """
-    operation_name = f"Sybase Operation: {operation_context}"
-    with tracer.start_as_current_span(operation_name) as span:
-        logger.info(f"Executing query: {query}")
+# One long-lived connection carries the whole health batch every cycle
+health_session = SybaseSession(
+    lambda: connect(dsn="server=your_server;database=your_db;chainxacts=0"),
+    meter=meter,
+    name="health",
+)
+
+def fetch_health_metrics():
+    """Fetch every registered Sybase health metric in a single batch."""
+    with tracer.start_as_current_span("Sybase Operation: Health Probe") as span:
         try:
-            with connect(dsn="server=your_server;database=your_db;chainxacts=0") as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                result = cursor.fetchall()
-                logger.info(f"Query executed successfully: {query}")
-                
-                # Set span attributes for additional metadata
-                span.set_attribute("db.query", query)
-                span.set_attribute("db.operation_context", operation_context)
-                span.set_attribute("db.row_count", len(result))
-                return result
+            with health_session.cursor() as cursor:
+                result = run_health_probe(cursor)
+            span.set_attribute("db.probe_count", len(result))
+            return result
         except Exception as e:
-            logger.error(f"Error executing query: {e}")
+            logger.error(f"Error executing health probe: {e}")
             span.record_exception(e)
             span.set_status(Status(StatusCode.ERROR, str(e)))
             raise
@@ -134,15 +160,19 @@ def trace_sybase_query(query, operation_context):
 def record_metrics():
     """Record metrics by fetching current system and custom metrics."""
     # Process-level metrics
-    cpu_usage_metric.add(get_cpu_usage())
-    memory_usage_metric.add(get_memory_usage())
-    
-    # Application-specific custom metrics
-    active_connections = fetch_active_connections()
-    active_connections_metric.add(active_connections)
-    
-    transaction_rate = fetch_transaction_rate()
-    transaction_rate_metric.add(transaction_rate)
+    latest_values["process_cpu"] = get_cpu_usage()
+    latest_values["process_memory"] = get_memory_usage()
+
+    # Application-specific custom metrics (levels, so gauges rather than counters),
+    # all collected in one round trip
+    health = fetch_health_metrics()
+    process_transactions = health.pop("process_transactions", None)
+    latest_values.update(health)
+    if process_transactions is not None:
+        delta, rate = transaction_tracker.sample(process_transactions)
+        transactions_total_metric.add(delta)
+        if rate is not None:
+            latest_values["transaction_rate"] = rate
 
 # Application loop
 print("Metrics collection, system instrumentation, tracing, and logging running. Sending data to OTLP endpoint...")
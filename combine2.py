@@ -15,6 +15,11 @@ from opentelemetry.sdk.resources import Resource
 
 import psutil
 import sybpydb
+from opentelemetry.metrics import Observation
+from delta import DeltaTracker
+from sybase_session import SybaseSession
+from mda_collector import MdaCollector
+from poll_scheduler import PollScheduler
 
 # Define OpenTelemetry Resource
 resource = Resource(attributes={"service.name": "sybase_app"})
@@ -46,32 +51,87 @@ logging.basicConfig(level=logging.INFO)
 otel_logger = logger_provider.get_logger("sybase_app_logger", logging.INFO)
 
 # === Custom Metrics ===
+# Latest readings; the gauges below report them on every export
+latest_values = {}
+
+
+def observe_latest(name):
+    """Gauge callback reporting the latest recorded value of a reading."""
+    def callback(options):
+        value = latest_values.get(name)
+        return [] if value is None else [Observation(value)]
+    return callback
+
+
 # Active connections and transaction rate metrics
-active_connections_metric = meter.create_up_down_counter(
+active_connections_metric = meter.create_observable_gauge(
     name="sybase_active_connections",
     description="Number of active connections to the Sybase database",
     unit="connections",
+    callbacks=[observe_latest("active_connections")],
 )
 
-transaction_rate_metric = meter.create_up_down_counter(
+transaction_rate_metric = meter.create_observable_gauge(
     name="sybase_transaction_rate",
-    description="Number of transactions processed per minute",
-    unit="transactions/min",
+    description="Transactions per second across all Sybase processes",
+    unit="transactions/s",
+    callbacks=[observe_latest("transaction_rate")],
+)
+
+io_rate_metric = meter.create_observable_gauge(
+    name="sybase_physical_io_rate",
+    description="Physical I/O operations per second across all Sybase processes",
+    unit="1/s",
+    callbacks=[observe_latest("io_rate")],
+)
+
+cpu_rate_metric = meter.create_observable_gauge(
+    name="sybase_cpu_rate",
+    description="CPU ticks per second used by all Sybase processes",
+    unit="1/s",
+    callbacks=[observe_latest("cpu_rate")],
+)
+
+# Per-interval increments of the cumulative sysprocesses and monProcessActivity counters
+transactions_total_metric = meter.create_counter(
+    name="sybase_transactions_total",
+    description="Transactions completed by Sybase processes",
+    unit="1",
+)
+
+io_total_metric = meter.create_counter(
+    name="sybase_physical_io_total",
+    description="Physical I/O operations performed by Sybase processes",
+    unit="1",
+)
+
+cpu_total_metric = meter.create_counter(
+    name="sybase_cpu_ticks_total",
+    description="CPU ticks used by Sybase processes",
+    unit="1",
 )
 
 # Process metrics
-cpu_usage_metric = meter.create_up_down_counter(
+cpu_usage_metric = meter.create_observable_gauge(
     name="process_cpu_usage_percent",
     description="CPU usage percentage of the current process",
     unit="%",
+    callbacks=[observe_latest("process_cpu")],
 )
 
-memory_usage_metric = meter.create_up_down_counter(
+memory_usage_metric = meter.create_observable_gauge(
     name="process_memory_usage_bytes",
     description="Memory usage of the process in bytes",
     unit="bytes",
+    callbacks=[observe_latest("process_memory")],
 )
 
+# sysprocesses and monProcessActivity counters are cumulative per process;
+# these turn them into deltas
+cpu_tracker = DeltaTracker()
+io_tracker = DeltaTracker()
+transaction_tracker = DeltaTracker()
+
 
 # === Sybase Database Connection ===
 def connect_to_sybase():
@@ -98,10 +158,8 @@ def get_memory_usage():
 
 def record_process_metrics():
     """Record CPU and memory usage."""
-    cpu_usage = get_cpu_usage()
-    memory_usage = get_memory_usage()
-    cpu_usage_metric.add(cpu_usage)
-    memory_usage_metric.add(memory_usage)
+    latest_values["process_cpu"] = get_cpu_usage()
+    latest_values["process_memory"] = get_memory_usage()
 
 
 def get_active_connections(conn):
@@ -113,21 +171,87 @@ def get_active_connections(conn):
     return active_connections
 
 
-def get_transaction_rate(conn):
-    """Query the Sybase database for transaction rate."""
+def get_process_counters(conn):
+    """Query the cumulative cpu and physical_io counters and blocker of every Sybase process."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT spid, loggedindatetime, cpu, physical_io, blocked FROM master..sysprocesses")
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def get_process_transactions(conn):
+    """Query the cumulative transaction count of every Sybase process (needs enable monitoring)."""
     cursor = conn.cursor()
-    cursor.execute("SELECT SUM(logical_reads + writes) FROM master..sysprocesses")
-    transaction_rate = cursor.fetchone()[0]
+    cursor.execute("SELECT SPID, KPID, Transactions FROM master..monProcessActivity")
+    rows = cursor.fetchall()
     cursor.close()
-    return transaction_rate
+    return rows
 
 
 def record_sybase_metrics(conn):
     """Record custom Sybase metrics."""
-    active_connections = get_active_connections(conn)
-    transaction_rate = get_transaction_rate(conn)
-    active_connections_metric.add(active_connections)
-    transaction_rate_metric.add(transaction_rate)
+    start_time = time.monotonic()
+    latest_values["active_connections"] = get_active_connections(conn)
+
+    # Key by spid and login time so a reused spid is not mistaken for the old one
+    rows = get_process_counters(conn)
+    now = time.monotonic()
+    cpu_delta, cpu_rate = cpu_tracker.sample({(spid, login): cpu for spid, login, cpu, _, _ in rows}, now)
+    io_delta, io_rate = io_tracker.sample({(spid, login): io for spid, login, _, io, _ in rows}, now)
+    latest_values["blocked_spids"] = sum(1 for row in rows if row[4])
+
+    cpu_total_metric.add(cpu_delta)
+    io_total_metric.add(io_delta)
+    if cpu_rate is not None:
+        latest_values["cpu_rate"] = cpu_rate
+        latest_values["io_rate"] = io_rate
+
+    # SPID and KPID together identify a process even when the spid is reused
+    transaction_delta, transaction_rate = transaction_tracker.sample(
+        {(spid, kpid): transactions for spid, kpid, transactions in get_process_transactions(conn)}, now)
+    transactions_total_metric.add(transaction_delta)
+    if transaction_rate is not None:
+        latest_values["transaction_rate"] = transaction_rate
+
+    # Smoothed, so one slow round trip does not swing every interval
+    latency = time.monotonic() - start_time
+    previous = latest_values.get("query_latency")
+    latest_values["query_latency"] = latency if previous is None else 0.7 * previous + 0.3 * latency
+
+
+# Probe latency (seconds) up to which the server counts as unloaded, and the
+# most the intervals are stretched while it answers slowly
+BASELINE_QUERY_LATENCY = 0.5
+MAX_PRESSURE = 4.0
+
+
+def sybase_pressure():
+    """
+    Poll more often while processes are blocked, to catch the blocking
+    chain, and less often while the server answers the probes slowly.
+    """
+    if latest_values.get("blocked_spids"):
+        return 0.5
+    latency = latest_values.get("query_latency")
+    if latency is None or latency <= BASELINE_QUERY_LATENCY:
+        return 1.0
+    return min(latency / BASELINE_QUERY_LATENCY, MAX_PRESSURE)
+
+
+def traced(operation, func):
+    """Wrap a collector in its own span and log its failures."""
+    def run():
+        with tracer.start_as_current_span("sybase_metrics_collection") as span:
+            # Add dynamic operation name
+            span.set_attribute("operation.name", operation)
+            try:
+                func()
+            except Exception as e:
+                otel_logger.error(f"{operation} failed: {e}")
+                span.record_exception(e)
+                raise
+    return run
 
 
 # === Main Application ===
@@ -136,20 +260,20 @@ def main():
     conn = connect_to_sybase()
     otel_logger.info("Connected to Sybase database.")
 
-    while True:
-        with tracer.start_as_current_span("sybase_metrics_collection") as span:
-            # Add dynamic operation name
-            span.set_attribute("operation.name", "metrics_collection")
-
-            # Record system and Sybase metrics
-            record_process_metrics()
-            record_sybase_metrics(conn)
+    # Per-statement and per-object performance from the MDA tables, read incrementally
+    mda_collector = MdaCollector(SybaseSession(connect_to_sybase, meter=meter, name="mda"), meter)
 
-            # Log custom message
-            otel_logger.info("Metrics collected and sent to OpenTelemetry Collector.")
+    def collect_mda():
+        for statement in mda_collector.collect():
+            otel_logger.info(f"Hot statement: {statement}")
 
-        # Sleep for the collection interval
-        time.sleep(10)
+    # Each collector runs on its own interval; slow ones back off, blocking tightens them all
+    # and slow probe queries stretch them all
+    scheduler = PollScheduler(pressure=sybase_pressure, meter=meter, name="sybase_app")
+    scheduler.add("sybase", traced("sybase_metrics", lambda: record_sybase_metrics(conn)), 10, priority=0)
+    scheduler.add("process", traced("process_metrics", record_process_metrics), 10, priority=1)
+    scheduler.add("mda", traced("mda_collection", collect_mda), 30, priority=2, min_interval=10)
+    scheduler.run_forever()
 
 
 if __name__ == "__main__":
@@ -25,3 +25,13 @@ BEGIN
     FROM sysobjects
     WHERE type = 'P'
 END
+sp_object_counts
+sql
+Copy code
+CREATE PROCEDURE sp_object_counts AS
+BEGIN
+    SELECT type, COUNT(*) AS object_count
+    FROM sysobjects
+    WHERE type IN ('U', 'V', 'P')
+    GROUP BY type
+END
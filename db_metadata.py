@@ -0,0 +1,54 @@
+import re
+
+# sysobjects type codes shown on the database info page
+OBJECT_TYPES = {
+    "U": "table_count",
+    "V": "view_count",
+    "P": "procedure_count",
+}
+
+# Database names are spliced into the SQL, so only allow plain identifiers
+_DATABASE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_$#@]*$")
+
+
+def _check_database_name(database):
+    if not _DATABASE_NAME.match(database):
+        raise ValueError(f"Invalid database name: {database!r}")
+    return database
+
+
+def object_counts_query(databases):
+    """
+    Build one batch that counts tables, views and procedures for every database.
+
+    Each database contributes a single GROUP BY over its sysobjects, and the
+    results are combined with UNION ALL so the whole batch is one round trip.
+    """
+    type_list = ", ".join(f"'{object_type}'" for object_type in OBJECT_TYPES)
+    selects = [
+        f"SELECT '{name}' AS db_name, type, COUNT(*) AS object_count "
+        f"FROM {name}..sysobjects WHERE type IN ({type_list}) GROUP BY type"
+        for name in map(_check_database_name, databases)
+    ]
+    return " UNION ALL ".join(selects)
+
+
+def fetch_object_counts(conn, databases):
+    """
+    Return {database: {"table_count": n, "view_count": n, "procedure_count": n}}.
+    """
+    databases = list(dict.fromkeys(databases))  # De-duplicate, keep order
+    counts = {name: {column: 0 for column in OBJECT_TYPES.values()} for name in databases}
+    if not databases:
+        return counts
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(object_counts_query(databases))
+        for db_name, object_type, object_count in cursor.fetchall():
+            column = OBJECT_TYPES.get(object_type.strip())
+            if column:
+                counts[db_name.strip()][column] = object_count
+    finally:
+        cursor.close()
+    return counts
@@ -0,0 +1,40 @@
+import time
+
+
+class DeltaTracker:
+    """
+    Turn cumulative per-key counters (e.g. per-spid cpu or physical_io from
+    sysprocesses) into per-interval deltas and rates.
+
+    Keys seen for the first time only set a baseline. A value lower than the
+    previous one is treated as a counter reset, so the new value is the
+    delta. Keys missing from a sample are forgotten, so a spid that logs out
+    and is reused starts from a fresh baseline (include the login time in
+    the key to catch reuse within one interval).
+    """
+
+    def __init__(self):
+        self._previous = {}
+        self._last_timestamp = None
+
+    def sample(self, values, timestamp=None):
+        """
+        Record {key: cumulative_value} and return (total_delta, rate_per_second).
+
+        The rate is None on the first sample, when there is no interval yet.
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        total_delta = 0
+        for key, value in values.items():
+            if value is None:
+                continue
+            previous = self._previous.get(key)
+            if previous is not None:
+                total_delta += value - previous if value >= previous else value
+        self._previous = {key: value for key, value in values.items() if value is not None}
+
+        rate = None
+        if self._last_timestamp is not None and timestamp > self._last_timestamp:
+            rate = total_delta / (timestamp - self._last_timestamp)
+        self._last_timestamp = timestamp
+        return total_delta, rate
@@ -0,0 +1,36 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Shared worker threads for querying several Sybase servers at once
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="sybase-fanout")
+
+
+def fan_out(func, servers, timeout=10, timeouts=None):
+    """
+    Run func(server) for every server in parallel and merge the results.
+
+    Each server gets its own deadline (timeouts[server], falling back to
+    timeout), measured from when the fan-out started, so the whole call
+    takes about as long as the slowest server that answers in time.
+
+    Returns (results, errors), both keyed by server.
+    """
+    timeouts = timeouts or {}
+    started = time.monotonic()
+    futures = {server: _executor.submit(func, server) for server in servers}
+
+    results = {}
+    errors = {}
+    # Check the shortest deadlines first so no server waits behind another
+    for server in sorted(futures, key=lambda name: timeouts.get(name, timeout)):
+        future = futures[server]
+        server_timeout = timeouts.get(server, timeout)
+        try:
+            results[server] = future.result(timeout=max(0, started + server_timeout - time.monotonic()))
+        except TimeoutError:
+            # A running query cannot be interrupted; its result is simply dropped
+            future.cancel()
+            errors[server] = f"Timed out after {server_timeout}s"
+        except Exception as e:
+            errors[server] = str(e)
+    return results, errors
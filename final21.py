@@ -2,6 +2,11 @@ import time
 import psutil
 import sybpydb
 from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+from sybase_session import SybaseSession
+from mda_collector import MdaCollector
+from metric_views import meter_provider_options, LOW_LATENCY_BUCKETS_MS
+from sql_fingerprint import fingerprint
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
@@ -13,7 +18,14 @@ resource = Resource.create(attributes={"service.name": "sybase_app"})
 # Metrics Exporter and Provider
 metric_exporter = OTLPMetricExporter(endpoint="http://localhost:4317", insecure=True)
 metric_reader = PeriodicExportingMetricReader(metric_exporter)
-meter_provider = MeterProvider(metric_readers=[metric_reader], resource=resource)
+meter_provider = MeterProvider(
+    metric_readers=[metric_reader],
+    resource=resource,
+    **meter_provider_options(
+        buckets={"sybase_query_execution_time_ms": LOW_LATENCY_BUCKETS_MS},
+        exponential=["sybase.mda.statement.cpu_time", "sybase.mda.statement.wait_time"],
+    ),
+)
 metrics.set_meter_provider(meter_provider)
 
 # Create a meter
@@ -45,7 +57,7 @@ memory_usage_metric = meter.create_up_down_counter(
 )
 
 # Create custom metrics
-query_execution_time_metric = meter.create_up_down_counter(
+query_execution_time_metric = meter.create_histogram(
     name="sybase_query_execution_time_ms",
     description="Execution time of Sybase queries in milliseconds",
     unit="ms",
@@ -69,22 +81,31 @@ active_connections_metric = meter.create_up_down_counter(
     unit="1",
 )
 
-transaction_rate_metric = meter.create_up_down_counter(
+# Sybase database connection parameters
+SYBASE_CONFIG = dict(
+    servername="SYBASE_SERVER_NAME",
+    database="DATABASE_NAME",
+    user="USERNAME",
+    password="PASSWORD"
+)
+
+# MDA tables are read over a long-lived session so statement history stays incremental
+mda_collector = MdaCollector(
+    SybaseSession(lambda: sybpydb.connect(**SYBASE_CONFIG), meter=meter, name="mda"),
+    meter,
+)
+
+transaction_rate_metric = meter.create_observable_gauge(
     name="sybase_transaction_rate",
-    description="Rate of transactions in the Sybase database (transactions per second)",
+    description="Rate of transactions in the Sybase database (commits per second)",
     unit="1",
+    callbacks=[lambda options: [Observation(mda_collector.rates["commits"])] if "commits" in mda_collector.rates else []],
 )
 
-# Sybase database connection parameters
 def connect_to_sybase():
     """Create a connection to the Sybase database."""
     try:
-        conn = sybpydb.connect(
-            servername="SYBASE_SERVER_NAME",
-            database="DATABASE_NAME",
-            user="USERNAME",
-            password="PASSWORD"
-        )
+        conn = sybpydb.connect(**SYBASE_CONFIG)
         return conn
     except Exception as e:
         print(f"Error connecting to Sybase: {e}")
@@ -103,11 +124,11 @@ def fetch_sybase_metrics(conn):
         active_connections_metric.add(active_connections)
         print(f"Active Connections: {active_connections}")
 
-        # Query for transaction rate (replace with appropriate Sybase query)
-        cursor.execute("SELECT SUM(tran_begin) - SUM(tran_commit) AS transaction_rate FROM master.dbo.sysmon")
-        transaction_rate = cursor.fetchone()[0]
-        transaction_rate_metric.add(transaction_rate)
-        print(f"Transaction Rate: {transaction_rate}")
+        # Transaction rate and per-statement/per-object activity from the MDA tables
+        hot_statements = mda_collector.collect()
+        print(f"Transaction Rate: {mda_collector.rates.get('commits')}")
+        for statement in hot_statements[:3]:
+            print(f"Hot statement: {statement}")
     except Exception as e:
         print(f"Failed to fetch Sybase metrics: {e}")
         query_failure_metric.add(1)  # Increment failure count
@@ -116,14 +137,15 @@ def fetch_sybase_metrics(conn):
 def execute_query(conn):
     """Execute a sample query on the Sybase database."""
     try:
+        query = "SELECT COUNT(*) FROM some_table"  # Replace with your query
         start_time = time.time()
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM some_table")  # Replace with your query
+        cursor.execute(query)
         rows = cursor.fetchone()
         execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
 
         # Record custom metrics
-        query_execution_time_metric.add(execution_time)
+        query_execution_time_metric.record(execution_time, {"statement": fingerprint(query)})
         rows_returned_metric.add(rows[0] if rows else 0)
         print(f"Query executed in {execution_time} ms, returned {rows[0]} rows")
     except Exception as e:
@@ -59,6 +59,7 @@ while True:
 import time
 import psutil
 import sybpydb
+from sql_fingerprint import statement_attributes
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
@@ -133,7 +134,7 @@ def execute_query(connection, query):
             cursor = connection.cursor()
             cursor.execute(query)
             results = cursor.fetchall()
-            span.set_attribute("query", query)
+            span.set_attributes(statement_attributes(query))
             span.set_attribute("query.success", True)
             return results
         except Exception as e:
@@ -192,6 +193,7 @@ if __name__ == "__main__":
 import time
 import psutil
 import sybpydb
+from sql_fingerprint import statement_attributes
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
@@ -266,7 +268,7 @@ def execute_query(connection, query):
             cursor = connection.cursor()
             cursor.execute(query)
             results = cursor.fetchall()
-            span.set_attribute("query", query)
+            span.set_attributes(statement_attributes(query))
             span.set_attribute("query.success", True)
             return results
         except Exception as e:
@@ -324,6 +326,7 @@ if __name__ == "__main__":
 import time
 import psutil
 import sybpydb
+from sql_fingerprint import statement_attributes
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
@@ -400,7 +403,7 @@ def execute_query(connection, query):
             cursor = connection.cursor()
             cursor.execute(query)
             results = cursor.fetchall()
-            span.set_attribute("query", query)
+            span.set_attributes(statement_attributes(query))
             span.set_attribute("query.success", True)
             return results
         except Exception as e:
@@ -460,6 +463,7 @@ if __name__ == "__main__":
 import time
 import psutil
 import sybpydb
+from sql_fingerprint import statement_attributes
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
@@ -538,7 +542,7 @@ def execute_query(connection, query):
             cursor = connection.cursor()
             cursor.execute(query)
             results = cursor.fetchall()
-            span.set_attribute("query", query)
+            span.set_attributes(statement_attributes(query))
             span.set_attribute("query.success", True)
             return results
         except Exception as e:
@@ -596,6 +600,11 @@ if __name__ == "__main__":
 import time
 import psutil
 import sybpydb
+from sql_fingerprint import statement_attributes
+from sybase_pool import get_pool
+from query_runner import run_queries
+from result_stream import BoundedRows
+from poll_scheduler import PollScheduler
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
@@ -649,6 +658,10 @@ process_memory_usage = meter.create_observable_gauge(
     callbacks=[get_memory_usage_callback],
 )
 
+# Result budget per query; larger results are truncated rather than held in memory
+MAX_RESULT_ROWS = 1000
+MAX_RESULT_BYTES = 1024 * 1024
+
 # Sybase database functions
 def connect_to_sybase(server, user, password, database):
     """
@@ -664,17 +677,22 @@ def connect_to_sybase(server, user, password, database):
             raise
 
 
-def execute_query(connection, query):
+def execute_query(statements, query, params=None):
     """
-    Execute a query on the Sybase database.
+    Execute a query on the Sybase database through the statement cache.
     """
     with tracer.start_as_current_span("sybase_query") as span:
         start_time = time.time()
         try:
-            cursor = connection.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
-            span.set_attribute("query", query)
+            cursor = statements.execute(query, params)
+            rows = BoundedRows(cursor, max_rows=MAX_RESULT_ROWS, max_bytes=MAX_RESULT_BYTES)
+            results = list(rows)
+            if rows.truncated:
+                # Unread rows are still pending on the cursor; open a fresh one next time
+                statements.discard(query)
+            span.set_attribute("db.row_count", rows.row_count)
+            span.set_attribute("db.result_truncated", rows.truncated)
+            span.set_attributes(statement_attributes(query))
             span.set_attribute("query.success", True)
             return results
         except Exception as e:
@@ -686,6 +704,10 @@ def execute_query(connection, query):
             span.set_attribute("execution_time_ms", execution_time)
 
 
+# Longest a single query may run before it is cancelled (seconds)
+QUERY_DEADLINE = 30
+
+
 def run_application():
     # Configuration
     server = "YOUR_SERVER"
@@ -693,32 +715,45 @@ def run_application():
     password = "YOUR_PASSWORD"
     database = "YOUR_DATABASE"
 
-    # Connect to Sybase
-    try:
-        connection = connect_to_sybase(server, user, password, database)
-    except Exception as e:
-        print(f"Error during connection: {e}")
-        return
-
     # Queries to execute
     queries = [
         "SELECT COUNT(*) FROM your_table",  # Replace with your actual query
         "SELECT TOP 10 * FROM your_table",  # Replace with your actual query
     ]
 
-    # Run continuously
-    while True:
-        for query in queries:
-            try:
-                results = execute_query(connection, query)
+    # Small connection pool so the queries can run side by side; the headroom
+    # covers cancelled queries whose connections are still being closed
+    pool = get_pool(
+        server,
+        connect=lambda: connect_to_sybase(server, user, password, database),
+        max_size=2 * len(queries),
+    )
+
+    failed_queries = []
+
+    def run_cycle():
+        # Independent queries run in parallel; the cycle lasts as long as the slowest one
+        failed_queries.clear()
+        for query, results, error in run_queries(pool, execute_query, queries, timeout=QUERY_DEADLINE):
+            if error:
+                failed_queries.append(query)
+                print(f"Error executing query '{query}': {error}")
+            else:
                 print(f"Results for query '{query}': {results}")
-            except Exception as e:
-                print(f"Error executing query '{query}': {e}")
 
-        # Sleep for 10 seconds before the next iteration
-        time.sleep(10)
+    # Poll every 10 seconds, backing off while queries are slow or failing
+    scheduler = PollScheduler(
+        pressure=lambda: 2.0 if failed_queries else 1.0,
+        meter=meter,
+        name="sybase_app",
+    )
+    scheduler.add("queries", run_cycle, 10, max_interval=120)
 
-    connection.close()
+    # Run continuously
+    try:
+        scheduler.run_forever()
+    finally:
+        pool.close()
     print("Connection closed.")
 
 
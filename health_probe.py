@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+# Registry of health metrics, one result set each, in batch order.
+# A result set with one column is a single value; with two columns it is
+# {label: value} (e.g. per database).
+HEALTH_PROBES = OrderedDict()
+
+
+def register_probe(name, sql):
+    """Add a metric to the health batch; sql must return exactly one result set."""
+    HEALTH_PROBES[name] = sql.strip()
+
+
+register_probe("active_connections", """
+    SELECT COUNT(*) FROM master..sysprocesses WHERE status = 'active'
+""")
+
+register_probe("blocked_spids", """
+    SELECT COUNT(*) FROM master..sysprocesses WHERE blocked > 0
+""")
+
+register_probe("log_usage_percent", """
+    SELECT db_name(dbid),
+           100.0 * (SUM(size) - lct_admin('logsegment_freepages', dbid)) / SUM(size)
+    FROM master..sysusages
+    WHERE segmap & 4 = 4
+    GROUP BY dbid
+""")
+
+register_probe("tempdb_usage_percent", """
+    SELECT 100.0 * (SUM(size) - SUM(curunreservedpgs(dbid, lstart, unreservedpgs))) / SUM(size)
+    FROM master..sysusages
+    WHERE dbid = db_id('tempdb')
+""")
+
+# Cumulative transactions per process (needs enable monitoring); keyed by
+# SPID:KPID so callers can turn them into deltas with a DeltaTracker
+register_probe("process_transactions", """
+    SELECT convert(varchar(12), SPID) + ':' + convert(varchar(12), KPID), Transactions
+    FROM master..monProcessActivity
+""")
+
+
+def health_batch(probes=None):
+    probes = HEALTH_PROBES if probes is None else probes
+    return "\n".join(probes.values())
+
+
+def run_health_probe(cursor, probes=None):
+    """
+    Run every registered probe as one SQL batch and return {name: value}.
+
+    The batch is a single round trip; its result sets are read in order
+    with nextset() and mapped back to the probe that produced them.
+    """
+    probes = HEALTH_PROBES if probes is None else probes
+    cursor.execute(health_batch(probes))
+
+    results = {}
+    for index, name in enumerate(probes):
+        if index and not cursor.nextset():
+            break  # Fewer result sets than probes; the rest stay missing
+        rows = cursor.fetchall()
+        if rows and len(rows[0]) == 2:
+            results[name] = {label.strip() if isinstance(label, str) else label: value for label, value in rows}
+        else:
+            results[name] = rows[0][0] if rows else None
+    return results
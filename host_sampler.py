@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+
+import psutil
+
+# Sample fields that can be averaged over the ring buffer
+NUMERIC_FIELDS = (
+    "cpu_usage",
+    "memory_usage",
+    "memory_used",
+    "disk_usage",
+    "net_sent_rate",
+    "net_recv_rate",
+)
+
+
+class HostSampler:
+    """
+    Background thread that samples host CPU, memory, disk and network usage.
+
+    One sampler is shared by every reader, so the psutil cost per tick is
+    the same no matter how many callers, gauges or browser streams are
+    watching. The last `window` samples are kept in a ring buffer with
+    running sums, so both latest() and average() are O(1).
+    """
+
+    def __init__(self, interval=2.0, window=30, disk_path="/"):
+        self.interval = interval
+        self.window = window
+        self.disk_path = disk_path
+        self._samples = deque(maxlen=window)
+        self._sums = dict.fromkeys(NUMERIC_FIELDS, 0.0)
+        self._sample = None
+        self._seq = 0
+        self._last_net = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="host-sampler", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _take_sample(self):
+        memory = psutil.virtual_memory()
+        now = time.monotonic()
+        net = psutil.net_io_counters()
+        last_time, last_net = self._last_net
+        elapsed = max(now - last_time, 1e-6)
+        self._last_net = (now, net)
+
+        sample = {
+            "timestamp": time.time(),
+            "cpu_usage": psutil.cpu_percent(interval=None),
+            "memory_usage": memory.percent,
+            "memory_used": memory.used,
+            "disk_usage": psutil.disk_usage(self.disk_path).percent,
+            "net_sent_rate": max(net.bytes_sent - last_net.bytes_sent, 0) / elapsed,
+            "net_recv_rate": max(net.bytes_recv - last_net.bytes_recv, 0) / elapsed,
+        }
+        with self._cond:
+            if len(self._samples) == self.window:
+                evicted = self._samples[0]
+                for field in NUMERIC_FIELDS:
+                    self._sums[field] -= evicted[field]
+            self._samples.append(sample)
+            for field in NUMERIC_FIELDS:
+                self._sums[field] += sample[field]
+            self._sample = sample
+            self._seq += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        # Prime cpu_percent (psutil keeps its baseline per thread, so this must
+        # run here) and the network counters; the first sample is taken one
+        # interval later, so it measures a real interval
+        psutil.cpu_percent(interval=None)
+        self._last_net = (time.monotonic(), psutil.net_io_counters())
+        while not self._stopped.wait(self.interval):
+            try:
+                self._take_sample()
+            except Exception:
+                pass  # Keep the last good sample and try again next tick
+
+    def _wait_for_first_sample(self):
+        self.start()
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > 0)
+
+    def latest(self):
+        """Return the most recent sample without touching psutil (waits for the first one)."""
+        self._wait_for_first_sample()
+        return self._sample
+
+    def average(self, field):
+        """Return the average of a numeric field over the ring buffer."""
+        self._wait_for_first_sample()
+        with self._cond:
+            return self._sums[field] / len(self._samples)
+
+    def wait_for_sample(self, last_seq=0, timeout=None):
+        """
+        Block until a sample newer than last_seq exists.
+
+        Returns (seq, sample); sample is None if the timeout expired first.
+        """
+        self.start()
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq, timeout):
+                return last_seq, None
+            return self._seq, self._sample
+
+
+# Shared sampler for the whole process
+sampler = HostSampler()
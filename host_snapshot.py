@@ -0,0 +1,29 @@
+import os
+
+import psutil
+
+_process = psutil.Process()
+
+
+def count_pids():
+    """Count running processes from /proc without building psutil's pid list."""
+    try:
+        return sum(1 for entry in os.scandir("/proc") if entry.name.isdigit())
+    except OSError:
+        return len(psutil.pids())
+
+
+def collect_host_snapshot(disk_path="/"):
+    """Gather host and current-process stats in one pass."""
+    snapshot = {
+        "cpu_usage": psutil.cpu_percent(interval=None),
+        "memory_usage": psutil.virtual_memory().percent,
+        "disk_usage": psutil.disk_usage(disk_path).percent,
+        "process_count": count_pids(),
+    }
+    # oneshot() reads /proc/self once for all the per-process values below
+    with _process.oneshot():
+        snapshot["process_cpu_usage"] = _process.cpu_percent(interval=None)
+        snapshot["process_memory_rss"] = _process.memory_info().rss
+        snapshot["process_threads"] = _process.num_threads()
+    return snapshot
@@ -0,0 +1,95 @@
+import threading
+from datetime import datetime
+
+from opentelemetry.metrics import Observation
+
+# Run-duration boundaries in seconds, from a few seconds up to a day
+JOB_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 14400, 43200, 86400)
+
+
+class JobMetrics:
+    """
+    Autosys job metrics derived from parsed autorep JobRecords.
+
+    - autosys.job.run.duration: histogram of Last End - Last Start, recorded
+      once per completed run (when a job's Last End changes), by job and
+      final status. The first snapshot only sets the baseline.
+    - autosys.jobs: gauge of jobs per pattern and status.
+    - autosys.jobs.late: gauge of jobs per pattern running longer than the
+      pattern's SLA (sla maps pattern to seconds, default_sla applies to
+      the rest; patterns without either are never late).
+
+    Attributes are limited to pattern, status and job name, so the series
+    count is bounded by the monitored jobs rather than by runs. Jobs that
+    no longer appear in a complete snapshot are forgotten.
+    """
+
+    def __init__(self, meter, sla=None, default_sla=None):
+        self.sla = sla or {}
+        self.default_sla = default_sla
+        self._last_end = {}  # job name -> Last End seen in the previous snapshot
+        self._counts = {}  # (pattern, status) -> number of jobs
+        self._late = {}  # pattern -> number of jobs past their SLA
+        self._lock = threading.Lock()
+
+        self._duration = meter.create_histogram(
+            "autosys.job.run.duration",
+            unit="s",
+            description="Run time of completed Autosys jobs",
+        )
+        meter.create_observable_gauge(
+            "autosys.jobs",
+            description="Number of Autosys jobs per pattern and status",
+            callbacks=[self._observe_counts],
+        )
+        meter.create_observable_gauge(
+            "autosys.jobs.late",
+            description="Number of Autosys jobs running longer than their SLA",
+            callbacks=[self._observe_late],
+        )
+
+    def _sla_for(self, pattern):
+        return self.sla.get(pattern, self.default_sla)
+
+    def record(self, jobs_by_pattern, now=None, complete=True):
+        """
+        Update all job metrics from {pattern: [JobRecord]}. Pass
+        complete=False when some patterns could not be fetched, so their
+        jobs keep their last known Last End.
+        """
+        now = now or datetime.now()
+        counts = {}
+        late = {}
+        jobs_by_name = {}
+        for pattern, jobs in jobs_by_pattern.items():
+            sla = self._sla_for(pattern)
+            late[pattern] = 0
+            for job in jobs:
+                counts[(pattern, job.status)] = counts.get((pattern, job.status), 0) + 1
+                if sla is not None and job.status == "RUNNING" and job.last_start \
+                        and (now - job.last_start).total_seconds() > sla:
+                    late[pattern] += 1
+                jobs_by_name[job.name] = job
+
+        with self._lock:
+            for name, job in jobs_by_name.items():
+                # A changed Last End on a known job means a run has just completed
+                if name in self._last_end and self._last_end[name] != job.last_end and job.duration is not None:
+                    self._duration.record(job.duration, {"job": name, "status": job.status})
+                self._last_end[name] = job.last_end
+            if complete:
+                for name in self._last_end.keys() - jobs_by_name.keys():
+                    del self._last_end[name]
+            self._counts = counts
+            self._late = late
+
+    def _observe_counts(self, options):
+        with self._lock:
+            return [
+                Observation(count, {"pattern": pattern, "status": status})
+                for (pattern, status), count in self._counts.items()
+            ]
+
+    def _observe_late(self, options):
+        with self._lock:
+            return [Observation(count, {"pattern": pattern}) for pattern, count in self._late.items()]
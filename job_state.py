@@ -0,0 +1,62 @@
+import json
+import os
+import threading
+from collections import namedtuple
+
+# previous is None for a job seen for the first time; job is None for one
+# that no longer appears in autorep output
+Transition = namedtuple("Transition", "name previous job")
+
+
+class JobStateTable:
+    """
+    Last known state of every Autosys job, diffed against each new snapshot.
+
+    A job changes state when its status or its run number changes, so a
+    job that fails again on a new run counts as a transition too. With a
+    path the table is saved after every update and loaded on start, so a
+    restart does not report every job as new.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._states = {}  # name -> (status, run)
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._states = {name: tuple(state) for name, state in json.load(f).items()}
+
+    def __len__(self):
+        return len(self._states)
+
+    def update(self, jobs, complete=True):
+        """
+        Diff a snapshot of JobRecords against the table, store it and return
+        the Transitions. Pass complete=False when part of the snapshot could
+        not be fetched, so missing jobs are kept rather than reported gone.
+        """
+        with self._lock:
+            transitions = []
+            states = {}
+            for job in jobs:
+                state = (job.status, job.run)
+                states[job.name] = state
+                previous = self._states.get(job.name)
+                if previous != state:
+                    transitions.append(Transition(job.name, previous[0] if previous else None, job))
+            for name in self._states.keys() - states.keys():
+                if complete:
+                    transitions.append(Transition(name, self._states[name][0], None))
+                else:
+                    states[name] = self._states[name]
+            self._states = states
+            if self.path:
+                self._save()
+            return transitions
+
+    def _save(self):
+        # Write then rename, so a crash never leaves a half-written file
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self._states, f)
+        os.replace(temporary, self.path)
@@ -0,0 +1,138 @@
+import time
+
+from delta import DeltaTracker
+
+# Cumulative per-process counters; keyed by SPID and KPID so a reused spid starts fresh
+PROCESS_ACTIVITY_QUERY = """
+SELECT SPID, KPID, CPUTime, WaitTime, LogicalReads, PhysicalReads, PagesWritten, Transactions, Commits, Rollbacks
+FROM master..monProcessActivity
+"""
+
+# Statement history. Reads are stateful per connection in ASE; the EndTime
+# high-water mark also keeps a reconnect from re-reading old statements.
+STATEMENT_QUERY = """
+SELECT DBName, isnull(object_name(ProcedureID, DBID), 'adhoc') AS ProcName, HashKey,
+       CpuTime, WaitTime, LogicalReads, PhysicalReads, RowsAffected, EndTime
+FROM master..monSysStatement
+WHERE EndTime > ?
+"""
+
+OBJECT_ACTIVITY_QUERY = """
+SELECT DBName, ObjectName, IndexID, LogicalReads, PhysicalReads, PagesWritten, LockWaits
+FROM master..monOpenObjectActivity
+"""
+
+PROCESS_COUNTERS = ("cpu_time", "wait_time", "logical_reads", "physical_reads",
+                    "pages_written", "transactions", "commits", "rollbacks")
+OBJECT_COUNTERS = ("logical_reads", "physical_reads", "pages_written", "lock_waits")
+
+# Start of the statement history when nothing has been read yet
+EPOCH = "19000101"
+
+
+class MdaCollector:
+    """
+    Incremental reader for the ASE MDA tables.
+
+    Requires enable monitoring, statement statistics active, statement pipe
+    active and per object statistics active. Use a long-lived connection
+    (e.g. a SybaseSession) so monSysStatement reads stay incremental.
+
+    Process and object counters are cumulative in ASE, so they go through
+    DeltaTrackers and are exported as per-interval increments; statements
+    are recorded into histograms attributed by database and procedure.
+    """
+
+    def __init__(self, session, meter, top_n=10):
+        self.session = session
+        self.top_n = top_n
+        self.statement_hwm = None  # EndTime of the newest statement read so far
+        self.rates = {}  # Latest per-second rates of the process counters
+
+        self._process_trackers = {name: DeltaTracker() for name in PROCESS_COUNTERS}
+        self._object_trackers = {}  # (db, object, index) -> {counter: DeltaTracker}
+
+        self._process_counters = {
+            name: meter.create_counter(f"sybase.mda.process.{name}", description=f"{name} across all Sybase processes")
+            for name in PROCESS_COUNTERS
+        }
+        self._object_counters = {
+            name: meter.create_counter(f"sybase.mda.object.{name}", description=f"{name} per Sybase object")
+            for name in OBJECT_COUNTERS
+        }
+        self._statement_cpu = meter.create_histogram(
+            "sybase.mda.statement.cpu_time", unit="ms", description="CPU time per completed statement")
+        self._statement_wait = meter.create_histogram(
+            "sybase.mda.statement.wait_time", unit="ms", description="Wait time per completed statement")
+        self._statement_io = meter.create_histogram(
+            "sybase.mda.statement.logical_reads", unit="1", description="Logical reads per completed statement")
+
+    def _fetch(self, query, params=None):
+        with self.session.cursor() as cursor:
+            if params is None:
+                cursor.execute(query)
+            else:
+                cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def collect_process_activity(self):
+        rows = self._fetch(PROCESS_ACTIVITY_QUERY)
+        now = time.monotonic()
+        for index, name in enumerate(PROCESS_COUNTERS, start=2):
+            delta, rate = self._process_trackers[name].sample(
+                {(row[0], row[1]): row[index] for row in rows}, now)
+            self._process_counters[name].add(delta)
+            if rate is not None:
+                self.rates[name] = rate
+        return self.rates
+
+    def collect_statements(self):
+        """Record statements finished since the last read; return the hottest by CPU."""
+        rows = self._fetch(STATEMENT_QUERY, (self.statement_hwm or EPOCH,))
+        hot = {}
+        for db_name, proc_name, hash_key, cpu_time, wait_time, logical_reads, physical_reads, rows_affected, end_time in rows:
+            attributes = {"db": db_name, "procedure": proc_name}
+            self._statement_cpu.record(cpu_time, attributes)
+            self._statement_wait.record(wait_time, attributes)
+            self._statement_io.record(logical_reads, attributes)
+
+            # Aggregate per statement hash to find hot queries without keeping every row
+            key = (db_name, proc_name, hash_key)
+            totals = hot.setdefault(key, [0, 0, 0, 0])
+            totals[0] += 1
+            totals[1] += cpu_time
+            totals[2] += wait_time
+            totals[3] += logical_reads
+            if end_time is not None and (self.statement_hwm is None or end_time > self.statement_hwm):
+                self.statement_hwm = end_time
+
+        top = sorted(hot.items(), key=lambda item: item[1][1], reverse=True)[:self.top_n]
+        return [
+            {"db": db, "procedure": proc, "hash_key": hash_key, "executions": count,
+             "cpu_time": cpu, "wait_time": wait, "logical_reads": reads}
+            for (db, proc, hash_key), (count, cpu, wait, reads) in top
+        ]
+
+    def collect_object_activity(self):
+        rows = self._fetch(OBJECT_ACTIVITY_QUERY)
+        now = time.monotonic()
+        seen = set()
+        for db_name, object_name, index_id, *values in rows:
+            key = (db_name, object_name, index_id)
+            seen.add(key)
+            trackers = self._object_trackers.setdefault(
+                key, {name: DeltaTracker() for name in OBJECT_COUNTERS})
+            attributes = {"db": db_name, "object": object_name}
+            for name, value in zip(OBJECT_COUNTERS, values):
+                delta, _ = trackers[name].sample({key: value}, now)
+                if delta:
+                    self._object_counters[name].add(delta, attributes)
+        # Objects no longer open (e.g. dropped tables) lose their baseline
+        for key in set(self._object_trackers) - seen:
+            del self._object_trackers[key]
+
+    def collect(self):
+        """Read all three MDA tables once; return the hottest statements of the interval."""
+        self.collect_process_activity()
+        self.collect_object_activity()
+        return self.collect_statements()
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+from opentelemetry import metrics
+
+meter = metrics.get_meter("metadata_cache")
+
+cache_hits = meter.create_counter(
+    "metadata.cache.hits",
+    description="Metadata lookups served from the cache",
+)
+cache_misses = meter.create_counter(
+    "metadata.cache.misses",
+    description="Metadata lookups that had to wait for Sybase",
+)
+cache_refresh_duration = meter.create_histogram(
+    "metadata.cache.refresh.duration",
+    unit="s",
+    description="Time taken to reload metadata from Sybase",
+)
+
+
+class MetadataCache:
+    """
+    LRU cache of per-(server, database) metadata with a TTL.
+
+    Entries younger than ttl are served as-is. Entries older than ttl but
+    younger than ttl + stale_ttl are served immediately while a background
+    thread reloads them (stale-while-revalidate). Anything older is
+    reloaded before returning.
+
+    loader(server, databases) must return {database: value} and is called
+    with every missing database of a lookup at once.
+    """
+
+    def __init__(self, loader, ttl=300, stale_ttl=600, max_entries=256):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # (server, database) -> (value, loaded_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _store(self, server, values):
+        now = time.monotonic()
+        with self._lock:
+            for database, value in values.items():
+                key = (server, database)
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, server, databases):
+        start_time = time.monotonic()
+        try:
+            values = self.loader(server, databases)
+        finally:
+            cache_refresh_duration.record(time.monotonic() - start_time, {"server": server})
+        self._store(server, values)
+        return values
+
+    def _refresh_in_background(self, server, databases):
+        def refresh():
+            try:
+                self._load(server, databases)
+            except Exception:
+                pass  # Keep serving the stale value; the next lookup retries
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update((server, database) for database in databases)
+
+        thread = threading.Thread(target=refresh, name="metadata-cache-refresh", daemon=True)
+        thread.start()
+
+    def get_many(self, server, databases):
+        """Return {database: value} for every requested database."""
+        now = time.monotonic()
+        results = {}
+        missing = []
+        stale = []
+
+        with self._lock:
+            for database in databases:
+                key = (server, database)
+                entry = self._entries.get(key)
+                if entry is None or now - entry[1] > self.ttl + self.stale_ttl:
+                    missing.append(database)
+                    continue
+                value, loaded_at = entry
+                self._entries.move_to_end(key)
+                results[database] = value
+                if now - loaded_at > self.ttl and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    stale.append(database)
+
+        if results:
+            cache_hits.add(len(results), {"server": server})
+        if stale:
+            self._refresh_in_background(server, stale)
+        if missing:
+            cache_misses.add(len(missing), {"server": server})
+            results.update(self._load(server, missing))
+
+        return {database: results[database] for database in databases if database in results}
+
+    def get(self, server, database):
+        return self.get_many(server, [database]).get(database)
+
+    def invalidate(self, server=None, database=None):
+        with self._lock:
+            for key in list(self._entries):
+                if (server is None or key[0] == server) and (database is None or key[1] == database):
+                    del self._entries[key]
@@ -0,0 +1,57 @@
+from opentelemetry.sdk.metrics.view import (
+    View,
+    ExplicitBucketHistogramAggregation,
+    ExponentialBucketHistogramAggregation,
+)
+
+try:
+    from opentelemetry.sdk.metrics import TraceBasedExemplarFilter
+except ImportError:  # SDK releases before exemplar support
+    TraceBasedExemplarFilter = None
+
+# Query latency boundaries in seconds. Fast probes (1-50 ms) get buckets of
+# their own instead of all landing in the SDK's first default bucket.
+LOW_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# The same boundaries for instruments recorded in milliseconds
+LOW_LATENCY_BUCKETS_MS = tuple(bound * 1000 for bound in LOW_LATENCY_BUCKETS)
+
+# Instruments that only need an accurate distribution, not fixed boundaries
+EXPONENTIAL_MAX_SIZE = 160
+
+
+def histogram_views(buckets=None, exponential=(), attribute_keys=None):
+    """
+    Build views giving each histogram instrument its own aggregation.
+
+    buckets maps an instrument name to its explicit bucket boundaries;
+    instruments named in exponential get a base-2 exponential histogram
+    instead. attribute_keys, if given, limits the attributes kept on every
+    view (e.g. {"statement"}), so stray high-cardinality labels are dropped.
+    """
+    views = []
+    for name, boundaries in (buckets or {}).items():
+        views.append(View(
+            instrument_name=name,
+            aggregation=ExplicitBucketHistogramAggregation(boundaries=boundaries),
+            attribute_keys=attribute_keys,
+        ))
+    for name in exponential:
+        views.append(View(
+            instrument_name=name,
+            aggregation=ExponentialBucketHistogramAggregation(max_size=EXPONENTIAL_MAX_SIZE),
+            attribute_keys=attribute_keys,
+        ))
+    return views
+
+
+def meter_provider_options(buckets=None, exponential=(), attribute_keys=None):
+    """
+    Keyword arguments for MeterProvider: the histogram views plus trace-based
+    exemplars, so a slow bucket links back to the span that recorded it.
+    Exemplars need the measurement to be recorded inside that span.
+    """
+    options = {"views": histogram_views(buckets, exponential, attribute_keys)}
+    if TraceBasedExemplarFilter is not None:
+        options["exemplar_filter"] = TraceBasedExemplarFilter()
+    return options
@@ -0,0 +1,89 @@
+import threading
+import time
+
+
+class SnapshotCollector:
+    """
+    Run collect() once per interval on a background thread and keep the result.
+
+    Observable gauge callbacks read the stored snapshot instead of doing the
+    work themselves, so the cost of collect() does not grow with the number
+    of gauges or with how often the exporter asks.
+    """
+
+    def __init__(self, collect, interval=5.0, name="snapshot-collector"):
+        self.collect = collect
+        self.interval = interval
+        self.name = name
+        self._snapshot = None
+        self._timestamp = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def refresh(self):
+        snapshot = self.collect()
+        with self._lock:
+            self._snapshot = snapshot
+            self._timestamp = time.time()
+        return snapshot
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                pass  # collect() reports its own failures; keep the previous snapshot
+            if self._stopped.wait(self.interval):
+                return
+
+    def latest(self, max_age=None):
+        """
+        Return the latest snapshot, or None if there is none yet or it is
+        older than max_age seconds.
+        """
+        with self._lock:
+            if self._timestamp is None:
+                return None
+            if max_age is not None and time.time() - self._timestamp > max_age:
+                return None
+            return self._snapshot
+
+    @property
+    def timestamp(self):
+        return self._timestamp
+
+
+class CachedSnapshot:
+    """
+    Collect on demand, at most once per max_age seconds.
+
+    All observable gauge callbacks of one export run within milliseconds of
+    each other, so with max_age shorter than the export interval they share
+    a single collect() call per cycle.
+    """
+
+    def __init__(self, collect, max_age=1.0):
+        self.collect = collect
+        self.max_age = max_age
+        self._snapshot = None
+        self._timestamp = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._timestamp is None or now - self._timestamp > self.max_age:
+                self._snapshot = self.collect()
+                self._timestamp = now
+            return self._snapshot
@@ -0,0 +1,145 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+
+class _Collector:
+    def __init__(self, name, func, interval, priority, min_interval, max_interval, slow_ratio):
+        self.name = name
+        self.func = func
+        self.base_interval = interval
+        self.interval = interval  # Current interval, before the pressure factor
+        self.priority = priority
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.slow_ratio = slow_ratio
+        self.effective_interval = interval
+        self.runs = 0
+        self.missed = 0
+
+    def adapt(self, duration, failed):
+        # A slow or failing collector backs off; a healthy one drifts back to its base interval
+        if failed or duration > self.slow_ratio * self.effective_interval:
+            self.interval = min(self.interval * 2, self.max_interval)
+        elif self.interval > self.base_interval and duration < self.slow_ratio * self.effective_interval / 4:
+            self.interval = max(self.interval / 2, self.base_interval)
+
+    def next_interval(self, factor):
+        self.effective_interval = min(max(self.interval * factor, self.min_interval), self.max_interval)
+        return self.effective_interval
+
+
+class PollScheduler:
+    """
+    Run several collectors from one loop, each on its own adaptive interval.
+
+    A collector whose run takes longer than slow_ratio of its interval (or
+    raises) has its interval doubled up to max_interval, and drifts back to
+    the base interval once it is fast again. pressure(), if given, is called
+    once per cycle and returns a factor applied to every interval: above 1
+    while the server is busy, below 1 (e.g. while blocking is present) to
+    look more often. Intervals are jittered by +/- jitter so collectors do
+    not fire in lockstep; collectors due at the same time run in priority
+    order (lower first). A run starting more than the jitter window after
+    its due time counts as a missed deadline.
+    """
+
+    def __init__(self, pressure=None, jitter=0.1, meter=None, name="poller"):
+        self.pressure = pressure
+        self.jitter = jitter
+        self.name = name
+        self.pressure_factor = 1.0
+        self._collectors = {}
+        self._queue = []  # (due, priority, seq, collector)
+        self._seq = itertools.count()
+        self._stopped = threading.Event()
+
+        meter = meter or metrics.get_meter("poll_scheduler")
+        self._missed_counter = meter.create_counter(
+            "poller.deadline.missed",
+            description="Collector runs that started later than their scheduled time",
+        )
+        self._run_duration = meter.create_histogram(
+            "poller.run.duration",
+            unit="s",
+            description="Time taken by one collector run",
+        )
+        meter.create_observable_gauge(
+            "poller.interval",
+            unit="s",
+            description="Current polling interval of each collector",
+            callbacks=[self._observe_intervals],
+        )
+
+    def add(self, name, func, interval, priority=0, min_interval=None, max_interval=None, slow_ratio=0.5):
+        """Register func() to run every interval seconds; the first run is due immediately."""
+        collector = _Collector(
+            name, func, interval, priority,
+            interval / 4 if min_interval is None else min_interval,
+            interval * 8 if max_interval is None else max_interval,
+            slow_ratio,
+        )
+        self._collectors[name] = collector
+        heapq.heappush(self._queue, (time.monotonic(), priority, next(self._seq), collector))
+        return collector
+
+    def _observe_intervals(self, options):
+        return [
+            Observation(collector.effective_interval, {"poller": self.name, "collector": name})
+            for name, collector in self._collectors.items()
+        ]
+
+    def _update_pressure(self):
+        if self.pressure is None:
+            return
+        try:
+            self.pressure_factor = self.pressure() or 1.0
+        except Exception:
+            self.pressure_factor = 1.0
+
+    def _run(self, collector, due):
+        start = time.monotonic()
+        attributes = {"poller": self.name, "collector": collector.name}
+        if start - due > max(collector.effective_interval * self.jitter, 0.1):
+            collector.missed += 1
+            self._missed_counter.add(1, attributes)
+
+        failed = False
+        try:
+            collector.func()
+        except Exception:
+            failed = True  # Collectors report their own errors; this one just backs off
+        duration = time.monotonic() - start
+        collector.runs += 1
+        self._run_duration.record(duration, {**attributes, "success": not failed})
+        collector.adapt(duration, failed)
+
+        interval = collector.next_interval(self.pressure_factor)
+        interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        heapq.heappush(self._queue, (time.monotonic() + interval, collector.priority, next(self._seq), collector))
+
+    def run_pending(self):
+        """Run every collector that is due; return seconds until the next one is."""
+        now = time.monotonic()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue))
+        if due:
+            self._update_pressure()
+            for due_at, _, _, collector in sorted(due, key=lambda item: (item[1], item[0])):
+                self._run(collector, due_at)
+        return max(self._queue[0][0] - time.monotonic(), 0) if self._queue else None
+
+    def run_forever(self):
+        while not self._stopped.is_set():
+            wait = self.run_pending()
+            if self._stopped.wait(1.0 if wait is None else wait):
+                return
+
+    def stop(self):
+        self._stopped.set()
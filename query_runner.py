@@ -0,0 +1,102 @@
+import threading
+
+from fanout import fan_out
+from statement_cache import StatementCache
+
+# One statement cache per pooled connection, so its cursors survive checkouts
+_statement_caches = {}
+_statement_caches_lock = threading.Lock()
+
+
+def _statements_for(conn):
+    with _statement_caches_lock:
+        statements = _statement_caches.get(conn)
+    if statements is None:
+        # Created outside the lock: it sets session options on the connection
+        statements = StatementCache(conn)
+        with _statement_caches_lock:
+            statements = _statement_caches.setdefault(conn, statements)
+    return statements
+
+
+def _forget(conn):
+    # Registered as a pool close listener, so statements never outlive their connection
+    with _statement_caches_lock:
+        statements = _statement_caches.pop(conn, None)
+    if statements is not None:
+        statements.close()
+
+
+class _Call:
+    """A running query's connection, shared with the caller so it can cancel the statement."""
+
+    def __init__(self):
+        self.conn = None
+        self.abandoned = False
+        self.lock = threading.Lock()
+
+
+def run_queries(pool, execute, queries, timeout=30, timeouts=None):
+    """
+    Run independent queries in parallel, each on its own pooled connection.
+
+    execute(statements, query) does the actual work (e.g. a script's
+    execute_query). Every query has a deadline (timeouts[query], falling
+    back to timeout). Queries that have not started by then are dropped;
+    running ones have their statement cancelled, and the worker closes the
+    connection once execute returns, so a consistently slow query cannot
+    hold pool slots into later cycles. A cycle therefore takes about as
+    long as its slowest query.
+
+    Returns [(query, result, error)] in the order of queries; the same
+    query listed twice is run twice.
+    """
+    pool.add_close_listener(_forget)
+    timeouts = timeouts or {}
+    calls = [_Call() for _ in queries]
+
+    def run_one(index):
+        call = calls[index]
+        conn = pool.checkout()
+        with call.lock:
+            if call.abandoned:
+                # The deadline passed while waiting for a connection
+                pool.checkin(conn)
+                raise TimeoutError(f"Query abandoned before it started: {queries[index]}")
+            call.conn = conn
+            statements = _statements_for(conn)
+        try:
+            result = execute(statements, queries[index])
+        except Exception:
+            with call.lock:
+                call.conn = None
+            pool.checkin(conn, discard=True)
+            raise
+        with call.lock:
+            call.conn = None
+            # A cancel may have been sent too late to stop this statement; do not reuse the session
+            discard = call.abandoned
+        pool.checkin(conn, discard=discard)
+        return result
+
+    def abandon(call):
+        # Only cancel here: the connection stays with the worker, which is
+        # still inside execute() and closes it once that returns or raises
+        with call.lock:
+            call.abandoned = True
+            conn = call.conn
+            if conn is None:
+                return
+            with _statement_caches_lock:
+                statements = _statement_caches.get(conn)
+            if statements is not None:
+                statements.cancel()
+
+    indexes = range(len(queries))
+    results, errors = fan_out(
+        run_one, indexes, timeout=timeout,
+        timeouts={index: timeouts[query] for index, query in enumerate(queries) if query in timeouts},
+    )
+    for index in errors:
+        abandon(calls[index])
+    return [(query, results.get(index), errors.get(index)) for index, query in enumerate(queries)]
@@ -0,0 +1,74 @@
+import json
+
+
+def iter_rows(cursor, batch_size=500):
+    """Yield rows one at a time, fetching batch_size rows per round trip."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def encode_row(row):
+    # Dates and decimals from Sybase are not JSON types; send them as strings
+    return json.dumps(list(row), default=str)
+
+
+def stream_json(rows, trailer):
+    """
+    Yield a JSON document {"rows": [...], **trailer} chunk by chunk.
+
+    trailer is read only after rows is exhausted, so the row generator can
+    fill it in (e.g. with a pagination cursor).
+    """
+    yield '{"rows": ['
+    separator = ""
+    for row in rows:
+        yield separator + encode_row(row)
+        separator = ","
+    yield "]"
+    for key, value in trailer.items():
+        yield f", {json.dumps(key)}: {json.dumps(value, default=str)}"
+    yield "}\n"
+
+
+def stream_ndjson(rows, trailer):
+    """Yield one JSON array per row and line, then the trailer as a final object."""
+    for row in rows:
+        yield encode_row(row) + "\n"
+    yield json.dumps(trailer, default=str) + "\n"
+
+
+def estimate_row_size(row):
+    """Rough payload size of a row in bytes (text length, 8 bytes per other value)."""
+    return sum(len(value) if isinstance(value, (str, bytes)) else 8 for value in row)
+
+
+class BoundedRows:
+    """
+    Lazily iterate a cursor in fetchmany batches, stopping at a row or byte budget.
+
+    After iteration, row_count, byte_count and truncated describe what was
+    read, so callers can report them instead of keeping the payload around.
+    A truncated cursor still has unread rows and should not be reused as-is.
+    """
+
+    def __init__(self, cursor, max_rows=1000, max_bytes=1024 * 1024, batch_size=100):
+        self.cursor = cursor
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.row_count = 0
+        self.byte_count = 0
+        self.truncated = False
+
+    def __iter__(self):
+        for row in iter_rows(self.cursor, min(self.batch_size, self.max_rows + 1)):
+            size = estimate_row_size(row)
+            if self.row_count >= self.max_rows or self.byte_count + size > self.max_bytes:
+                self.truncated = True
+                return
+            self.row_count += 1
+            self.byte_count += size
+            yield row
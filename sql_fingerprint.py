@@ -0,0 +1,56 @@
+import hashlib
+import re
+from functools import lru_cache
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_HEX = re.compile(r"\b0x[0-9a-f]*\b", re.IGNORECASE)
+_NUMBER = re.compile(r"(?<![\w@#])[-+]?\d+(?:\.\d*)?(?:e[-+]?\d+)?", re.IGNORECASE)
+_IN_LIST = re.compile(r"\bIN\s*\(\?(?:,\?)*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"(\(\?(?:,\?)*\))(?:,\(\?(?:,\?)*\))+")
+_PUNCTUATION = re.compile(r"\s*([=<>!,])\s*|(\()\s*|\s*(\))")
+_SPACE = re.compile(r"\s+")
+
+# Normalized text longer than this is cut off in span attributes
+MAX_STATEMENT_LENGTH = 1024
+
+
+@lru_cache(maxsize=2048)
+def normalize(sql):
+    """
+    Reduce a statement to its shape: comments are dropped, string, hex and
+    numeric literals become ?, IN-lists and multi-row VALUES collapse to a
+    single placeholder group, whitespace collapses and case is folded.
+
+    Statements that differ only in their literals normalize identically.
+    """
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _HEX.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PUNCTUATION.sub(lambda match: match.group(match.lastindex), sql)
+    sql = _IN_LIST.sub("IN (?...)", sql)
+    sql = _VALUES_LIST.sub(r"\1...", sql)
+    return _SPACE.sub(" ", sql).strip().upper()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """Stable short hash of the normalized statement, for labels and aggregation keys."""
+    return hashlib.sha1(normalize(sql).encode("utf-8")).hexdigest()[:16]
+
+
+def operation(sql):
+    """First keyword of the normalized statement (SELECT, EXEC, ...)."""
+    normalized = normalize(sql)
+    return normalized.split(" ", 1)[0] if normalized else ""
+
+
+def statement_attributes(sql):
+    """Span attributes describing a statement without its literal values."""
+    normalized = normalize(sql)
+    return {
+        "db.operation": operation(sql),
+        "db.statement": normalized[:MAX_STATEMENT_LENGTH],
+        "db.statement.fingerprint": fingerprint(sql),
+    }
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+
+from opentelemetry import metrics
+
+from sql_fingerprint import fingerprint
+
+meter = metrics.get_meter("statement_cache")
+
+statement_duration = meter.create_histogram(
+    "sybase.statement.duration",
+    unit="ms",
+    description="Time taken to execute a cached Sybase statement",
+)
+
+
+# Session options that let ASE reuse plans of ad hoc statements: the
+# statement cache matches on SQL text, and literal autoparameterization
+# lets statements that differ only in literals share one cached plan.
+# They only take effect when the server's "statement cache size" is set.
+SERVER_CACHE_OPTIONS = ("set statement_cache on", "set literal_autoparam on")
+
+
+class StatementCache:
+    """
+    Long-lived cursors for the statements run on one connection.
+
+    sybpydb sends every execute as a language command, so there is no
+    client-side prepare. Plan reuse comes from the ASE statement cache,
+    which this enables for the session (SERVER_CACHE_OPTIONS, best effort);
+    the server then skips compilation for statement text it has seen. What
+    the cache itself saves is allocating a cursor per execution, and it
+    times every statement into a per-fingerprint histogram.
+
+    At most max_statements cursors are kept; the least recently used one is
+    closed when the limit is reached.
+    """
+
+    def __init__(self, connection, max_statements=32, server_cache=True):
+        self.connection = connection
+        self.max_statements = max_statements
+        self._cursors = OrderedDict()  # sql -> cursor
+        self._lock = threading.Lock()
+        if server_cache:
+            self._enable_server_cache()
+
+    def _enable_server_cache(self):
+        # Older servers or restricted logins reject the options; queries still work without them
+        for option in SERVER_CACHE_OPTIONS:
+            cursor = None
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute(option)
+            except Exception:
+                pass
+            finally:
+                if cursor is not None:
+                    self._close(cursor)
+
+    def _cursor_for(self, sql):
+        with self._lock:
+            cursor = self._cursors.get(sql)
+            if cursor is not None:
+                self._cursors.move_to_end(sql)
+                return cursor
+            cursor = self.connection.cursor()
+            self._cursors[sql] = cursor
+            if len(self._cursors) > self.max_statements:
+                _, evicted = self._cursors.popitem(last=False)
+                self._close(evicted)
+            return cursor
+
+    @staticmethod
+    def _close(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def execute(self, sql, params=None):
+        """Execute a statement on its cached cursor and return the cursor."""
+        cursor = self._cursor_for(sql)
+        start_time = time.time()
+        try:
+            if params is None:
+                cursor.execute(sql)
+            else:
+                cursor.execute(sql, params)
+        except Exception:
+            # The cursor may be left in a bad state; open a fresh one next time
+            self.discard(sql)
+            raise
+        finally:
+            statement_duration.record((time.time() - start_time) * 1000, {"statement": fingerprint(sql)})
+        return cursor
+
+    def cancel(self):
+        """Ask the driver to cancel statements still running on this connection (best effort)."""
+        with self._lock:
+            cursors = list(self._cursors.values())
+        for cursor in cursors:
+            cancel = getattr(cursor, "cancel", None)
+            if cancel is not None:
+                try:
+                    cancel()
+                except Exception:
+                    pass
+
+    def discard(self, sql):
+        with self._lock:
+            cursor = self._cursors.pop(sql, None)
+        if cursor is not None:
+            self._close(cursor)
+
+    def close(self):
+        with self._lock:
+            cursors = list(self._cursors.values())
+            self._cursors.clear()
+        for cursor in cursors:
+            self._close(cursor)
@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import sybpydb
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free in time."""
+
+
+class SybasePool:
+    """
+    Bounded, thread-safe pool of sybpydb connections for a single server.
+    """
+
+    def __init__(self, key, connect_kwargs, max_size=5, checkout_timeout=10,
+                 max_idle=300, health_check_after=30, connect=None):
+        self.key = key
+        self.connect_kwargs = connect_kwargs
+        self.connect = connect  # Optional callable used instead of sybpydb.connect
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_idle = max_idle  # Close idle connections older than this (seconds)
+        self.health_check_after = health_check_after  # Ping connections idle longer than this
+
+        self._idle = deque()  # (connection, last_used) pairs, most recently used on the right
+        self._in_use = 0
+        self._waiters = 0
+        self._close_listeners = []
+        self._lock = threading.Condition()
+
+    @property
+    def in_use(self):
+        return self._in_use
+
+    @property
+    def waiters(self):
+        return self._waiters
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def _open(self):
+        if self.connect is not None:
+            return self.connect()
+        return sybpydb.connect(**self.connect_kwargs)
+
+    def add_close_listener(self, callback):
+        """Call callback(conn) whenever the pool closes one of its connections."""
+        with self._lock:
+            if callback not in self._close_listeners:
+                self._close_listeners.append(callback)
+
+    def _close(self, conn):
+        for callback in list(self._close_listeners):
+            try:
+                callback(conn)
+            except Exception:
+                pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self, now):
+        # Oldest connections sit on the left of the deque
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def checkout(self):
+        """Borrow a connection, opening a new one if the pool has room."""
+        start_time = time.monotonic()
+        deadline = start_time + self.checkout_timeout
+
+        while True:
+            conn = None
+            last_used = None
+            with self._lock:
+                expired = self._evict_idle(time.monotonic())
+                while not self._idle and self._in_use >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No Sybase connection available for {self.key}")
+                    self._waiters += 1
+                    try:
+                        self._lock.wait(remaining)
+                    finally:
+                        self._waiters -= 1
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                self._in_use += 1
+
+            for stale in expired:
+                self._close(stale)
+
+            try:
+                if conn is None:
+                    conn = self._open()
+                elif time.monotonic() - last_used > self.health_check_after and not self._is_healthy(conn):
+                    # Dead connection; drop it and try again
+                    self._close(conn)
+                    self._release_slot()
+                    continue
+            except Exception:
+                self._release_slot()
+                raise
+
+            _record_checkout(self.key, time.monotonic() - start_time)
+            return conn
+
+    def _release_slot(self):
+        with self._lock:
+            self._in_use -= 1
+            self._lock.notify()
+
+    def checkin(self, conn, discard=False):
+        """Return a borrowed connection; discarded connections are closed."""
+        expired = []
+        if discard:
+            self._close(conn)
+        else:
+            with self._lock:
+                now = time.monotonic()
+                self._idle.append((conn, now))
+                # Also evict here, so a quiet pool does not keep stale connections until the next checkout
+                expired = self._evict_idle(now)
+        self._release_slot()
+        for stale in expired:
+            self._close(stale)
+
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        try:
+            yield conn
+        except BaseException:
+            # The session state is unknown after a failure (or an abandoned
+            # streaming response), so do not reuse it
+            self.checkin(conn, discard=True)
+            raise
+        else:
+            self.checkin(conn)
+
+    def close(self):
+        with self._lock:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._close(conn)
+
+
+# Pools are shared process-wide and keyed per server
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(server, **kwargs):
+    """
+    Return the shared pool for a server, creating it on first use.
+
+    Keyword arguments are passed to sybpydb.connect, except the pool
+    settings (max_size, checkout_timeout, max_idle, health_check_after) and
+    connect, a callable that opens connections in place of sybpydb.connect.
+    """
+    pool_options = {
+        name: kwargs.pop(name)
+        for name in ("max_size", "checkout_timeout", "max_idle", "health_check_after", "connect")
+        if name in kwargs
+    }
+    with _pools_lock:
+        pool = _pools.get(server)
+        if pool is None:
+            pool = SybasePool(server, kwargs, **pool_options)
+            _pools[server] = pool
+        return pool
+
+
+def close_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# Checkout histograms of every meter the pool metrics are reported through
+_checkout_histograms = []
+
+
+def _record_checkout(server, duration):
+    for histogram in list(_checkout_histograms):
+        histogram.record(duration, {"server": server})
+
+
+def _observe(attribute):
+    def callback(options):
+        with _pools_lock:
+            pools = list(_pools.values())
+        return [Observation(getattr(pool, attribute), {"server": pool.key}) for pool in pools]
+    return callback
+
+
+def instrument(meter):
+    """
+    Report pool metrics through meter, e.g. one from an app's own
+    MeterProvider. They already go to the global meter provider, so only
+    call this for a provider that is not set globally.
+    """
+    _checkout_histograms.append(meter.create_histogram(
+        "sybase.pool.checkout.duration",
+        unit="s",
+        description="Time spent waiting to check out a pooled Sybase connection",
+    ))
+    meter.create_observable_gauge(
+        "sybase.pool.connections.in_use",
+        callbacks=[_observe("in_use")],
+        description="Pooled Sybase connections currently checked out",
+    )
+    meter.create_observable_gauge(
+        "sybase.pool.connections.idle",
+        callbacks=[_observe("idle")],
+        description="Pooled Sybase connections open but not in use",
+    )
+    meter.create_observable_gauge(
+        "sybase.pool.waiters",
+        callbacks=[_observe("waiters")],
+        description="Threads waiting for a pooled Sybase connection",
+    )
+
+
+# Scripts that set a global meter provider export the pool metrics through it
+instrument(metrics.get_meter("sybase_pool"))
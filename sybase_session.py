@@ -0,0 +1,148 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from opentelemetry import metrics
+
+
+class SessionUnavailable(Exception):
+    """Raised while waiting out the backoff after a failed reconnect."""
+
+
+class SybaseSession:
+    """
+    Long-lived Sybase connection for polling loops.
+
+    The connection is opened once and reused across iterations. A connection
+    that has been idle longer than validate_after seconds is checked with a
+    cheap query before use; a failed query or check drops it, and the next
+    use reconnects. Failed reconnects back off exponentially (initial_backoff
+    doubling up to max_backoff) without blocking the caller: until the next
+    attempt is due, connection() raises SessionUnavailable.
+
+    on_connect(connection) runs after every successful (re)connect. The
+    reconnect counter and reconnects only count attempts made after the
+    first connection was established, not the initial connect.
+    """
+
+    def __init__(self, connect, on_connect=None, validate_query="SELECT 1", validate_after=30,
+                 initial_backoff=1, max_backoff=60, meter=None, name="sybase"):
+        self.connect = connect
+        self.on_connect = on_connect
+        self.validate_query = validate_query
+        self.validate_after = validate_after
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.name = name
+
+        self.reconnects = 0
+        self.last_reconnect_duration = None
+        self._conn = None
+        self._established = False  # True once a connection has been opened
+        self._last_used = 0
+        self._backoff = 0
+        self._next_attempt = 0
+        self._lock = threading.RLock()
+
+        meter = meter or metrics.get_meter("sybase_session")
+        self._reconnect_counter = meter.create_counter(
+            "sybase.session.reconnects",
+            description="Number of times the Sybase session was (re)established",
+        )
+        self._reconnect_duration = meter.create_histogram(
+            "sybase.session.reconnect.duration",
+            unit="s",
+            description="Time taken to (re)establish the Sybase session",
+        )
+
+    def _open(self):
+        now = time.monotonic()
+        if now < self._next_attempt:
+            raise SessionUnavailable(
+                f"Reconnect to {self.name} backing off for {self._next_attempt - now:.1f}s")
+
+        start_time = time.monotonic()
+        conn = None
+        try:
+            conn = self.connect()
+            if self.on_connect:
+                self.on_connect(conn)
+        except Exception:
+            if conn is not None:
+                # on_connect failed; do not leak the session it was given
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._backoff = min(self._backoff * 2 or self.initial_backoff, self.max_backoff)
+            self._next_attempt = time.monotonic() + self._backoff
+            if self._established:
+                self._reconnect_counter.add(1, {"session": self.name, "success": False})
+            raise
+
+        duration = time.monotonic() - start_time
+        if self._established:
+            self.reconnects += 1
+            self.last_reconnect_duration = duration
+            self._reconnect_counter.add(1, {"session": self.name, "success": True})
+        self._established = True
+        self._reconnect_duration.record(duration, {"session": self.name})
+        self._backoff = 0
+        self._next_attempt = 0
+        self._conn = conn
+        self._last_used = time.monotonic()
+        return conn
+
+    def _is_alive(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.validate_query)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def invalidate(self):
+        """Drop the current connection; the next use reconnects."""
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def connection(self):
+        with self._lock:
+            conn = self._conn
+            if conn is not None and time.monotonic() - self._last_used > self.validate_after:
+                if not self._is_alive(conn):
+                    self.invalidate()
+                    conn = None
+            if conn is None:
+                conn = self._open()
+            self._last_used = time.monotonic()
+            return conn
+
+    @contextmanager
+    def cursor(self):
+        """Yield a cursor on the session; any error drops the connection."""
+        cursor = None
+        try:
+            cursor = self.connection().cursor()
+            yield cursor
+        except Exception:
+            self.invalidate()
+            raise
+        else:
+            self._last_used = time.monotonic()
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    def close(self):
+        self.invalidate()